@@ -1,17 +1,16 @@
+<%! from dirg_util.bundle import bundle_tags %>
 <!DOCTYPE html>
 <!--
 In this file all the imports of external libraries should be declared.
+The files are declared in dirg_util.bundle.BUNDLES and served as bundles when scripts/bundle_static.py has been run.
 -->
 <html ng-app="main">
     <head>
         <%block name="meta"/>
-        <script src="/static/angular.js" ></script>
-        <script src="/static/jquery.min.latest.js"></script>
-        <script src="/static/bootstrap/js/bootstrap.min.js"></script>
+        ${bundle_tags("head.js") | n}
         <%block name="script"/>
-        <link href="/static/bootstrap/css/bootstrap.min.css" rel="stylesheet" media="screen">
-        <link rel="stylesheet" type="text/css" href="/static/basic.css">
-        <link rel="stylesheet" type="text/css" href="/static/toaster.css">
+        ${bundle_tags("head.screen.css") | n}
+        ${bundle_tags("head.css") | n}
         <%block name="css"/>
         <title> <%block name="title"/></title>
     </head>
@@ -32,8 +31,7 @@ In this file all the imports of external libraries should be declared.
                     </div>
                 </div>
 
-            <script src="/static/toaster.js"></script>
-            <script src="/static/bootbox.min.js" ></script>
+            ${bundle_tags("footer.js") | n}
         </%block>
 
 
@@ -0,0 +1,16 @@
+#!/usr/bin/env python
+"""
+Builds the fingerprinted static bundles used by base.mako. Run it after the static files have been installed or
+changed, before precompress_static.py.
+
+    bundle_static.py [root]
+"""
+import sys
+from dirg_util.bundle import build
+
+if __name__ == "__main__":
+    root = "/opt/dirg/dirg-util/"
+    if len(sys.argv) > 1:
+        root = sys.argv[1]
+    for name, filename in sorted(build(root).items()):
+        print "%s: %s" % (name, filename)
@@ -0,0 +1,15 @@
+#!/usr/bin/env python
+"""
+Writes precompressed .gz (and .br if brotli is installed) variants of the static files, to be served by
+HttpHandler.handle_static. Run it after the static files have been installed or changed.
+
+    precompress_static.py [static folder ...]
+"""
+import sys
+from dirg_util.static import precompress
+
+if __name__ == "__main__":
+    folders = sys.argv[1:] or ["/opt/dirg/dirg-util/static/"]
+    for folder in folders:
+        for path in precompress(folder):
+            print "wrote %s" % path
@@ -9,6 +9,8 @@ setup(
     license="Apache 2.0",
     packages=["dirg_util", "auth", "auth/pyoidc"],
     package_dir = {"": "src"},
+    package_data={"dirg_util": ["mime_types.txt"]},
+    scripts=["scripts/bundle_static.py", "scripts/precompress_static.py"],
     classifiers = ["Development Status :: 4 - Beta",
         "License :: OSI Approved :: Apache Software License",
         "Topic :: Software Development :: Libraries :: Python Modules"],
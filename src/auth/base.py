@@ -1,7 +1,8 @@
 import logging
 import time
 from dirg_util.aes import AESCipher
-from dirg_util.http_util import CookieDealer, InvalidCookieSign
+from dirg_util.http_util import CookieDealer, InvalidCookieSign, Request
+from dirg_util.ratelimit import RateLimited
 
 
 __author__ = 'haho0032'
@@ -26,8 +27,13 @@ class CookieObject(object):
 class Authenticate(CookieDealer):
     CONST_ACR = 'acr_values'
 
-    def __init__(self, cookie_dict=None, cookie_object=None):
+    def __init__(self, cookie_dict=None, cookie_object=None, rate_limiter=None):
+        """
+        :param rate_limiter: A dirg_util.ratelimit.RateLimiter for the login attempts, or None.
+        """
         self.aes_chipher = None
+        self.rate_limiter = rate_limiter
+        self.address_warned = False
         if cookie_object is not None:
             CookieDealer.__init__(self, cookie_object)
         elif cookie_dict is not None:
@@ -109,6 +115,38 @@ class Authenticate(CookieDealer):
         else:
             return _dict[key][0]
 
+    def check_rate_limit(self, request, username=None, **kwargs):
+        """
+        Checks a login attempt against the rate limiter. The client address is taken from the Request, or from the
+        WSGI environment in the keyword argument environ.
+        :param request: The request given to verify.
+        :param username: The username, or None if it is not known.
+        :raise RateLimited: If the attempt must be rejected.
+        """
+        if self.rate_limiter is None:
+            return
+        if isinstance(request, Request):
+            environ = request.environ
+        else:
+            environ = kwargs.get("environ")
+        address = None
+        if environ is not None:
+            address = self.rate_limiter.client_address(environ)
+        elif not self.address_warned:
+            self.address_warned = True
+            logger.warning("Login attempts are only limited per username, verify is called without a Request or "
+                           "environ.")
+        if not self.rate_limiter.allow(address, username):
+            raise RateLimited("Too many login attempts.")
+
+    def login_failed(self, username):
+        """
+        Counts a failed login attempt for a username, see dirg_util.ratelimit.RateLimiter.failed.
+        :param username: The username.
+        """
+        if self.rate_limiter is not None and username is not None:
+            self.rate_limiter.failed(username)
+
     def can_use_cookie(self):
         if self.srv is not None:
             return True
@@ -132,7 +170,7 @@ class Authenticate(CookieDealer):
         if cookie is None:
             return None
         else:
-            logger.debug("kwargs: %s" % kwargs)
+            logger.debug("kwargs: %s", kwargs)
 
             try:
                 val = self.getCookieValue(cookie, self.srv.cookie_name)
@@ -1,7 +1,6 @@
 import base64
 import json
 import urllib
-import urlparse
 import uuid
 import requests
 import xml.etree.ElementTree as ET
@@ -9,9 +8,10 @@ import xml.etree.ElementTree as ET
 __author__ = 'haho0032'
 import logging
 import string
-from urlparse import parse_qs
 from auth.base import Authenticate
-from dirg_util.http_util import Response, HttpHandler, Unauthorized, Redirect
+from dirg_util.http_util import Response, HttpHandler, Unauthorized, Redirect, Request
+from dirg_util.offload import get_pool
+from dirg_util.query import parse_query
 
 __author__ = 'haho0032'
 
@@ -44,16 +44,23 @@ class CasAuthentication(Authenticate):
     CONST_CAS_COOKIE = "cascookie"
     #The parameter name in the cookie containing the filter.
     CONST_FILTER = "filter"
+    #Name of the thread pool for ticket validations.
+    POOL = "cas"
 
     def __init__(self, cas_server, service_url, extra_validation=None,
-                 cookie_dict=None, cookie_object=None):
+                 cookie_dict=None, cookie_object=None, timeout=10,
+                 rate_limiter=None):
         """
-
+        :param timeout: Seconds to wait for the CAS server when a ticket is
+            validated.
+        :param rate_limiter: A dirg_util.ratelimit.RateLimiter, the ticket
+            validations are limited per client address.
         """
-        Authenticate.__init__(self, cookie_dict, cookie_object)
+        Authenticate.__init__(self, cookie_dict, cookie_object, rate_limiter)
         self.cas_server = cas_server
         self.service_url = service_url
         self.extra_validation = extra_validation
+        self.timeout = timeout
 
     def filter_query(self, query_dict, filter):
         filter_query = ""
@@ -76,7 +83,7 @@ class CasAuthentication(Authenticate):
         """
         filter_query = ""
         try:
-            req = urlparse.parse_qs(query)
+            req = parse_query(query, multi=True)
             if self.CONST_ACR not in req:
                 if len(req) > 0:
                     query += "&"
@@ -116,8 +123,11 @@ class CasAuthentication(Authenticate):
         :return: Uid if the login was successful otherwise None.
         """
         data = {self.CONST_TICKET: ticket, self.CONST_SERVICE: service_url}
-        resp = requests.get(self.cas_server + self.CONST_CAS_VERIFY_TICKET,
-                            params=data)
+        # The request is made in a bounded thread pool, so a slow CAS server
+        # can only hold up a few threads.
+        resp = get_pool(self.POOL).call(
+            requests.get, self.cas_server + self.CONST_CAS_VERIFY_TICKET,
+            params=data, timeout=self.timeout)
         root = ET.fromstring(resp.content)
         for l1 in root:
             if self.CONST_AUTHSUCCESS in l1.tag:
@@ -144,26 +154,32 @@ class CasAuthentication(Authenticate):
         return self.service_url + "?" + self.CONST_NONCE + "=" + nonce + filter_query
             #"&acr_values=" + acr
 
-    def verify(self, request, cookie, **kwargs):
+    def verify(self, request, cookie=None, **kwargs):
         """
          Verifies if the authentication was successful.
 
          :rtype : Response
-         :param request: Contains the request parameters.
-         :param cookie: Cookies sent with the request.
+         :param request: Contains the request parameters, or a Request.
+         :param cookie: Cookies sent with the request. Taken from the Request if None.
          :param kwargs: Any other parameters.
          :return: If the authentication was successful: a redirect to the
          return_to url.
                   Otherwise a unauthorized response.
          :raise: ValueError
+         :raise RateLimited: If there have been too many login attempts.
          """
-        logger.debug("verify(%s)" % request)
-        if isinstance(request, basestring):
-            _dict = parse_qs(request)
+        logger.debug("verify(%s)", request)
+        if isinstance(request, Request):
+            if cookie is None:
+                cookie = request.cookie
+            _dict = request.query
+        elif isinstance(request, basestring):
+            _dict = parse_query(request, multi=True)
         elif isinstance(request, dict):
             _dict = request
         else:
             raise ValueError("Wrong type of input")
+        self.check_rate_limit(request, **kwargs)
         try:
             cas_cookie, _ts, _typ = self.getCookieValue(cookie,
                                                         self.CONST_CAS_COOKIE)
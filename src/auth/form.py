@@ -1,9 +1,14 @@
 import logging
+import re
 import string
-from urlparse import parse_qs
+import uuid
+from mako.filters import html_escape
 from pyYubitool.yubikeyutil import YubikeyValidation
 from auth.base import Authenticate
-from dirg_util.http_util import Response, HttpHandler, Unauthorized, Redirect
+from dirg_util.cache import LRUCache
+from dirg_util.http_util import Response, HttpHandler, Unauthorized, Redirect, Request
+from dirg_util.preload import preload_links
+from dirg_util.query import parse_query
 
 __author__ = 'haho0032'
 
@@ -12,13 +17,20 @@ logger = logging.getLogger("dirg_util.auth")
 
 
 class DirgUsernamePasswordYubikeyMako(Authenticate):
+    #Template arguments that change with every request. The login form is rendered once for every combination of
+    #the other arguments, and these are put into the cached form.
+    FORM_REQUEST_FIELDS = ("query", "login")
+    #Characters in the placeholders that other filters than h would change.
+    FORM_PROBE = "<>&\"'%+ "
 
     def __init__(self, username_query_key, mako_template, template_lookup, pwd=None, password_query_key=None,
-                 yubikey_db=None, yubikey_server=None, yubikey_otp_key=None,cookie_dict=None, cookie_object=None):
+                 yubikey_db=None, yubikey_server=None, yubikey_otp_key=None,cookie_dict=None, cookie_object=None,
+                 form_cache_size=128, rate_limiter=None):
         """
-
+        :param form_cache_size: Number of rendered login forms to keep, 0 to render the form for every request.
+        :param rate_limiter: A dirg_util.ratelimit.RateLimiter for the login attempts, or None.
         """
-        Authenticate.__init__(self, cookie_dict, cookie_object)
+        Authenticate.__init__(self, cookie_dict, cookie_object, rate_limiter)
         self.username_query_key = username_query_key
         self.password_query_key = password_query_key
         self.yubikey_db = yubikey_db
@@ -30,6 +42,18 @@ class DirgUsernamePasswordYubikeyMako(Authenticate):
         self.yubikey_validator = None
         if self.yubikey_server is not None:
             self.yubikey_validator = YubikeyValidation(self.yubikey_server)
+        self.form_cache = None
+        if form_cache_size:
+            self.form_cache = LRUCache(max_entries=form_cache_size)
+        # The placeholders end with FORM_PROBE, so a placeholder is only found in the rendered form if the template
+        # escapes it exactly like html_escape does.
+        self.form_token = uuid.uuid4().hex
+        self.form_placeholders = dict((field, "dirg%s%s%s" % (field, self.form_token, self.FORM_PROBE))
+                                      for field in self.FORM_REQUEST_FIELDS)
+        self.form_fields = dict((str(html_escape(placeholder)), field)
+                                for field, placeholder in self.form_placeholders.iteritems())
+        self.form_placeholder_pattern = re.compile("(%s)" % "|".join(re.escape(escaped)
+                                                                     for escaped in self.form_fields))
 
     def create_response(self, argv=None, cookie=None, **kwargs):
         """
@@ -39,27 +63,97 @@ class DirgUsernamePasswordYubikeyMako(Authenticate):
             headers = [cookie]
         else:
             headers = []
+        links = preload_links(self.template_lookup, self.mako_template)
+        if links:
+            headers.append(('Link', links))
 
         resp = Response(headers=headers)
 
-        logger.info("do_authentication argv: %s" % argv)
-        mte = self.template_lookup.get_template(self.mako_template)
-        resp.message = mte.render(**argv)
+        logger.info("do_authentication argv: %s", argv)
+        resp.message = self.render_form(argv)
         return resp
 
+    def render_form(self, argv):
+        """
+        Renders the login form. The form is cached for the arguments that are the same for many users, the values
+        of FORM_REQUEST_FIELDS are HTML escaped, like the h filter of Mako does, and put into the cached form.
+
+        A form is cached by rendering it once with placeholders for the values. The placeholders contain the
+        characters of FORM_PROBE, so a template that writes a value without the h filter, or changes it in another
+        way, leaves no usable placeholder and its form is rendered for every request.
+        :param argv: The template arguments.
+        :return: The rendered form.
+        """
+        mte = self.template_lookup.get_template(self.mako_template)
+        if self.form_cache is None:
+            return mte.render(**argv)
+        values = dict((field, argv.get(field)) for field in self.FORM_REQUEST_FIELDS)
+        try:
+            key = tuple(sorted((name, value) for name, value in argv.iteritems() if name not in values)) + \
+                tuple(bool(value) for value in values.itervalues())
+            parts = self.form_cache.get(key)
+        except TypeError:
+            return mte.render(**argv)
+        if parts is None:
+            parts = self._form_parts(mte, argv, values)
+            self.form_cache.set(key, parts)
+        if not parts:
+            return mte.render(**argv)
+        try:
+            return self._fill_form(parts, values)
+        except (TypeError, UnicodeError):
+            return mte.render(**argv)
+
+    def _form_parts(self, mte, argv, values):
+        """
+        :return: The form split at the placeholders, the parts at odd positions are field names. An empty tuple if
+            the form can not be cached.
+        """
+        _argv = dict(argv)
+        for field, value in values.iteritems():
+            # Empty values are rendered as they are, since templates often test them.
+            if value:
+                _argv[field] = self.form_placeholders[field]
+        parts = self.form_placeholder_pattern.split(mte.render(**_argv))
+        for index in range(1, len(parts), 2):
+            parts[index] = self.form_fields[parts[index]]
+        parts = tuple(parts)
+        used = set(parts[1::2])
+        if any(value and field not in used for field, value in values.iteritems()):
+            logger.debug("Login form %s is not cached, a value is not escaped with the h filter.", self.mako_template)
+            return ()
+        if any(self.form_token in part for part in parts[::2]):
+            logger.debug("Login form %s is not cached, a value is not only escaped.", self.mako_template)
+            return ()
+        return parts
+
+    @staticmethod
+    def _fill_form(parts, values):
+        form = list(parts)
+        for index in range(1, len(form), 2):
+            form[index] = html_escape(values[form[index]])
+        return "".join(form)
+
+    def _failed(self, username):
+        self.login_failed(username)
+        return False, None, None
+
     def verify(self, request, **kwargs):
         """
         Verifies that the given username and password was correct
         :param request: Either the query part of a URL a urlencoded
-            body of a HTTP message or a parse such.
+            body of a HTTP message, a parse such or a Request.
         :param kwargs: Catch whatever else is sent.
-        :return: redirect back to where ever the base applications
-            wants the user after authentication.
+        :return: A tuple (True, username, query parameters) if the username and password are correct, otherwise
+            (False, None, None).
+        :raise RateLimited: If there have been too many login attempts.
         """
 
-        logger.debug("verify(%s)" % request)
-        if isinstance(request, basestring):
-            _dict = parse_qs(request)
+        logger.debug("verify(%s)", request)
+        if isinstance(request, Request):
+            _dict = request.query
+        elif isinstance(request, basestring):
+            _dict = parse_query(request, multi=True)
         elif isinstance(request, dict):
             _dict = request
         else:
@@ -73,6 +167,8 @@ class DirgUsernamePasswordYubikeyMako(Authenticate):
         else:
             username = _dict[self.username_query_key][0]
 
+        self.check_rate_limit(request, username, **kwargs)
+
         valid = False
 
         if self.password_query_key is not None:
@@ -85,10 +181,10 @@ class DirgUsernamePasswordYubikeyMako(Authenticate):
                 if self.passwd is not None:
                     valid = password == self.passwd[username]
                 if not valid:
-                    return False, None, None, None
+                    return self._failed(username)
             except (AssertionError, KeyError):
                 if not valid:
-                    return False, None, None, None
+                    return self._failed(username)
 
         if self.yubikey_otp_key is not None and self.yubikey_validator is not None and self.yubikey_db is not None:
             # verify username and password
@@ -101,12 +197,12 @@ class DirgUsernamePasswordYubikeyMako(Authenticate):
                 try:
                     valid = self.yubikey_validator.validate_opt(username, otp, self.yubikey_db, 0)
                     if not valid:
-                        return False, None, None, None
+                        return self._failed(username)
                 except (AssertionError, KeyError):
                     if not valid:
-                        return False, None, None, None
+                        return self._failed(username)
 
         if valid:
             return True, username, _dict
 
-        return False, None, None, None
+        return self._failed(username)
@@ -1,9 +1,12 @@
 import logging
-import urlparse
 import time
 from oic.utils.authn.user import UserAuthnMethod, create_return_url
 from auth.base import Authenticate
 from auth.form import DirgUsernamePasswordYubikeyMako
+from dirg_util.http_util import REQUEST_ERRORS
+from dirg_util.query import parse_query
+from dirg_util.ratelimit import RateLimited
+from oic.utils.http_util import BadRequest
 from oic.utils.http_util import Redirect
 from oic.utils.http_util import Unauthorized
 
@@ -54,18 +57,19 @@ class UsernamePasswordMako(_UserAuthnMethod):
 
     def __init__(self, username_query_key, srv, mako_template, template_lookup, pwd, acr=None, return_to="",
                  templ_arg_func=None, cookie_dict=None, password_query_key=None, yubikey_db=None, yubikey_server=None,
-                 yubikey_otp_key=None):
+                 yubikey_otp_key=None, rate_limiter=None):
         """
         :param srv: The server instance
         :param mako_template: Which Mako template to use
         :param pwd: Username/password dictionary like database
         :param return_to: Where to send the user after authentication
+        :param rate_limiter: A dirg_util.ratelimit.RateLimiter for the login attempts, or None.
         :return:
         """
 
         authn_helper=DirgUsernamePasswordYubikeyMako(username_query_key, mako_template, template_lookup, pwd,
                                                      password_query_key, yubikey_db, yubikey_server, yubikey_otp_key,
-                                                     cookie_dict=cookie_dict, )
+                                                     cookie_dict=cookie_dict, rate_limiter=rate_limiter)
 
         _UserAuthnMethod.__init__(self, srv, authn_helper=authn_helper)
         self.acr = acr
@@ -86,7 +90,7 @@ class UsernamePasswordMako(_UserAuthnMethod):
         :return:
         """
         try:
-            req = urlparse.parse_qs(kwargs["query"])
+            req = parse_query(kwargs["query"], multi=True)
             acr = req[Authenticate.CONST_ACR][0]
         except:
             if Authenticate.CONST_ACR in kwargs:
@@ -126,19 +130,26 @@ class UsernamePasswordMako(_UserAuthnMethod):
             kwargs[Authenticate.CONST_ACR] = self.acr
         return self.authn_helper.create_response(self.templ_arg_func(**kwargs), cookie)
 
-    def verify(self, request, **kwargs):
+    def verify(self, request, environ=None, **kwargs):
         """
         Verifies that the given username and password was correct
         :param request: Either the query part of a URL a urlencoded
-            body of a HTTP message or a parse such.
+            body of a HTTP message, a parse such or a Request.
+        :param environ: The WSGI environment. Needed for the client address when login attempts are rate limited
+            and request is not a Request.
         :param kwargs: Catch whatever else is sent.
         :return: redirect back to where ever the base applications
             wants the user after authentication.
         """
         try:
-            valid, uid, parameters = self.authn_helper.verify(request)
+            valid, uid, parameters = self.authn_helper.verify(request, environ=environ, **kwargs)
         except (AssertionError, KeyError):
             resp = Unauthorized("Unknown user or wrong password")
+        except RateLimited:
+            resp = Unauthorized("Too many login attempts, try again later.")
+        except REQUEST_ERRORS as error:
+            logger.warning("Could not parse the login request: %s", error)
+            resp = BadRequest("The request could not be parsed.")
         else:
             if valid:
                 cookie = self.authn_helper.create_authentication_cookie(uid, "upm")
@@ -1,6 +1,9 @@
 
 import logging
 from auth.cas import CasAuthentication
+from dirg_util.http_util import REQUEST_ERRORS
+from dirg_util.ratelimit import RateLimited
+from oic.utils.http_util import BadRequest
 from oic.utils.http_util import Redirect
 from oic.utils.http_util import Unauthorized
 from auth.pyoidc.user import _UserAuthnMethod
@@ -15,7 +18,7 @@ class CasAuthnMethod(_UserAuthnMethod):
     CONST_QUERY = "query"
 
     def __init__(self, srv, cas_server, service_url, return_to, acr,
-                 extra_validation=None):
+                 extra_validation=None, rate_limiter=None):
         """
         Constructor for the class.
         :param srv: Usually none, but otherwise the oic server.
@@ -24,11 +27,13 @@ class CasAuthnMethod(_UserAuthnMethod):
         this case the oic server's verify URL.
         :param return_to: The URL to return to after a successful
         authentication.
+        :param rate_limiter: A dirg_util.ratelimit.RateLimiter, or None.
         """
         _UserAuthnMethod.__init__(self, srv, authn_helper=CasAuthentication(cas_server, service_url,
                                                                             extra_validation=None,
                                                                             cookie_dict=None,
-                                                                            cookie_object=None))
+                                                                            cookie_object=None,
+                                                                            rate_limiter=rate_limiter))
         self.acr = acr
         self.return_to = return_to
 
@@ -40,13 +45,15 @@ class CasAuthnMethod(_UserAuthnMethod):
 
         return self.authn_helper.create_redirect(query, self.acr, filter)
 
-    def verify(self, request, cookie, **kwargs):
+    def verify(self, request, cookie=None, environ=None, **kwargs):
         """
         Verifies if the authentication was successful.
 
         :rtype : Response
-        :param request: Contains the request parameters.
-        :param cookie: Cookies sent with the request.
+        :param request: Contains the request parameters, or a Request.
+        :param cookie: Cookies sent with the request. Taken from the Request if None.
+        :param environ: The WSGI environment. Needed for the client address when login attempts are rate limited
+            and request is not a Request.
         :param kwargs: Any other parameters.
         :return: If the authentication was successful: a redirect to the
         return_to url.
@@ -54,7 +61,7 @@ class CasAuthnMethod(_UserAuthnMethod):
         :raise: ValueError
         """
         try:
-            valid, uid, return_to_query = self.authn_helper.verify(request, cookie, **kwargs)
+            valid, uid, return_to_query = self.authn_helper.verify(request, cookie, environ=environ, **kwargs)
             if valid:
                 cookie = self.authn_helper.create_authentication_cookie(uid, "casm")
                 return_to = self.generateReturnUrl(self.return_to, uid)
@@ -67,6 +74,11 @@ class CasAuthnMethod(_UserAuthnMethod):
             else:
                 logger.fatal('User is not valid.', exc_info=True)
                 return Unauthorized("You are not authorized!")
+        except RateLimited:
+            return Unauthorized("Too many login attempts, try again later.")
+        except REQUEST_ERRORS as error:
+            logger.warning("Could not parse the CAS request: %s", error)
+            return BadRequest("The request could not be parsed.")
         except:
             logger.fatal('Metod verify in user_cas.py had a fatal exception.', exc_info=True)
             return Unauthorized("You are not authorized!")
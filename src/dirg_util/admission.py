@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Umeå University
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Admission control for WSGI applications, with limits on the requests every route class handles and queues at
+the same time.
+"""
+import logging
+import threading
+import time
+
+from dirg_util.http_util import ServiceUnavailable
+
+logger = logging.getLogger("dirg_util.admission")
+
+#Path prefixes, without the leading /, and their route classes. The first matching prefix is used.
+ROUTES = [("static/", "static"), ("robots.txt", "static"), ("health", "health"), ("verify", "verify"),
+          ("login", "login")]
+#Route class -> (requests handled at the same time, requests waiting, longest wait in seconds). None for no limit.
+LIMITS = {
+    "static": None,
+    "health": None,
+    "verify": (8, 16, 2.0),
+    "login": (16, 32, 2.0),
+    "default": (32, 64, 5.0),
+}
+DEFAULT_CLASS = "default"
+
+
+class RouteClass(object):
+    """
+    The requests of a route class that are handled or waiting.
+    """
+
+    def __init__(self, name, max_in_flight, max_queue, max_wait):
+        """
+        :param name: Name of the route class.
+        :param max_in_flight: Number of requests handled at the same time.
+        :param max_queue: Number of requests that may wait for a free place.
+        :param max_wait: Seconds a request may wait.
+        """
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.condition = threading.Condition(threading.Lock())
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        #Moving average of the wait of the admitted requests, in seconds.
+        self.average_wait = 0.0
+
+    def acquire(self):
+        """
+        Waits for a place.
+        :return: True if the request is admitted, it must then call release when it is done.
+        """
+        with self.condition:
+            if self.in_flight < self.max_in_flight:
+                self.in_flight += 1
+                self.admitted += 1
+                return True
+            if self.waiting >= self.max_queue:
+                self.rejected += 1
+                return False
+            started = time.time()
+            deadline = started + self.max_wait
+            self.waiting += 1
+            try:
+                while self.in_flight >= self.max_in_flight:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        self.rejected += 1
+                        return False
+                    self.condition.wait(remaining)
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+            self.admitted += 1
+            self.average_wait = 0.9 * self.average_wait + 0.1 * (time.time() - started)
+            return True
+
+    def release(self):
+        with self.condition:
+            self.in_flight -= 1
+            self.condition.notify()
+
+    def stats(self):
+        """
+        :return: Dictionary with the current state and the counters of the route class.
+        """
+        with self.condition:
+            return {"in_flight": self.in_flight, "waiting": self.waiting, "admitted": self.admitted,
+                    "rejected": self.rejected, "average_wait": self.average_wait}
+
+
+class _AdmittedResponse(object):
+    """
+    The response iterable of an admitted request. The place is released when the server closes the response.
+    """
+
+    def __init__(self, app_iter, route_class):
+        self.app_iter = app_iter
+        self.route_class = route_class
+
+    def __iter__(self):
+        return iter(self.app_iter)
+
+    def close(self):
+        try:
+            if hasattr(self.app_iter, "close"):
+                self.app_iter.close()
+        finally:
+            if self.route_class is not None:
+                self.route_class.release()
+                self.route_class = None
+
+
+class AdmissionMiddleware(object):
+    def __init__(self, app, routes=None, limits=None, retry_after=5):
+        """
+        :param app: The WSGI application.
+        :param routes: List of tuples (path prefix, route class), defaults to ROUTES.
+        :param limits: Dictionary with route class as key and a tuple (requests handled at the same time, requests
+            waiting, longest wait in seconds) or None as value. Replaces the limits in LIMITS for these classes.
+        :param retry_after: Seconds sent in the Retry-After header of a rejected request.
+        """
+        self.app = app
+        self.routes = routes if routes is not None else ROUTES
+        _limits = dict(LIMITS)
+        if limits:
+            _limits.update(limits)
+        self.classes = {}
+        for name, limit in _limits.iteritems():
+            self.classes[name] = RouteClass(name, *limit) if limit is not None else None
+        if DEFAULT_CLASS not in self.classes:
+            self.classes[DEFAULT_CLASS] = None
+        self.rejection = ServiceUnavailable("The service is busy, please try again later.",
+                                            headers=[("Retry-After", str(retry_after))])
+
+    def classify(self, environ):
+        """
+        :param environ: The WSGI environment.
+        :return: Name of the route class of the request.
+        """
+        path = environ.get("PATH_INFO", "").lstrip("/")
+        for prefix, name in self.routes:
+            if path.startswith(prefix):
+                return name
+        return DEFAULT_CLASS
+
+    def __call__(self, environ, start_response):
+        route_class = self.classes.get(self.classify(environ), self.classes[DEFAULT_CLASS])
+        if route_class is None:
+            return self.app(environ, start_response)
+        if not route_class.acquire():
+            logger.warning("Rejected a request for route class %s, %d requests in flight.", route_class.name,
+                           route_class.in_flight)
+            return self.rejection(environ, start_response)
+        try:
+            app_iter = self.app(environ, start_response)
+        except:
+            route_class.release()
+            raise
+        if isinstance(app_iter, list):
+            # The body has already been produced.
+            route_class.release()
+            return app_iter
+        return _AdmittedResponse(app_iter, route_class)
+
+    def stats(self):
+        """
+        :return: Dictionary with route class as key and RouteClass.stats as value, for the limited classes.
+        """
+        return dict((name, route_class.stats()) for name, route_class in self.classes.iteritems()
+                    if route_class is not None)
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Umeå University
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Concatenates and minifies static assets into bundles named after a hash of their content.
+"""
+import hashlib
+import json
+import logging
+import os
+import posixpath
+import re
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+logger = logging.getLogger("dirg_util.bundle")
+
+#Roots searched for source files and bundle manifests, in priority order.
+ROOTS = ["/opt/dirg/dirg-util/", ""]
+BUNDLE_FOLDER = "static/bundle"
+MANIFEST_FILE = "manifest.json"
+
+#The assets declared by base.mako. The order of the files is kept.
+BUNDLES = {
+    "head.js": ["static/angular.js",
+                "static/jquery.min.latest.js",
+                "static/bootstrap/js/bootstrap.min.js"],
+    "head.screen.css": ["static/bootstrap/css/bootstrap.min.css"],
+    "head.css": ["static/basic.css",
+                 "static/toaster.css"],
+    "footer.js": ["static/toaster.js",
+                  "static/bootbox.min.js"],
+}
+
+#The media attribute of the link tags of style sheet bundles that do not apply to all media.
+MEDIA = {
+    "head.screen.css": "screen",
+}
+
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+CSS_COMMENT = re.compile(r"/\*(?!!).*?\*/", re.DOTALL)
+
+_manifest = None
+
+
+def find_source(name, roots=None):
+    """
+    :param name: Name of a static file, for example static/angular.js.
+    :param roots: Roots to search, defaults to ROOTS.
+    :return: Path to the file or None.
+    """
+    for root in roots or ROOTS:
+        path = os.path.join(root, name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def rewrite_css_urls(css, name):
+    """
+    Makes relative url() references absolute, since a bundle is not served from the folder of its sources.
+    :param css: Style sheet.
+    :param name: Name of the style sheet, for example static/bootstrap/css/bootstrap.css.
+    :return: The style sheet with absolute urls.
+    """
+    folder = posixpath.dirname(name)
+
+    def replace(match):
+        url = match.group(2).strip()
+        if url.startswith(("/", "#", "data:", "http:", "https:")):
+            return match.group(0)
+        return "url(%s%s%s)" % (match.group(1), "/" + posixpath.normpath(posixpath.join(folder, url)),
+                                match.group(1))
+
+    return CSS_URL.sub(replace, css)
+
+
+def minify_css(css):
+    if rcssmin is not None:
+        return rcssmin.cssmin(css)
+    css = CSS_COMMENT.sub("", css)
+    return "\n".join(line.strip() for line in css.splitlines() if line.strip())
+
+
+def minify_js(js):
+    if rjsmin is not None:
+        return rjsmin.jsmin(js)
+    return js
+
+
+def bundle_content(sources, kind, roots=None, minify=True):
+    """
+    Concatenates the source files of a bundle.
+    :param sources: List with names of static files.
+    :param kind: "js" or "css".
+    :param roots: Roots to search, defaults to ROOTS.
+    :param minify: Minify files that are not already minified.
+    :return: The bundle content.
+    """
+    parts = []
+    for name in sources:
+        path = find_source(name, roots)
+        if path is None:
+            raise IOError("Missing source file %s for bundle." % name)
+        with open(path, "rb") as _file:
+            content = _file.read()
+        minified = ".min." in name
+        if kind == "css":
+            content = rewrite_css_urls(content, name)
+            if minify and not minified:
+                content = minify_css(content)
+        elif minify and not minified:
+            content = minify_js(content)
+        parts.append(content.strip())
+    if kind == "js":
+        return ";\n".join(parts) + ";\n"
+    return "\n".join(parts) + "\n"
+
+
+def build(root, bundles=None, roots=None, minify=True):
+    """
+    Writes all bundles and the bundle manifest to the bundle folder of a root.
+    :param root: Root to write the bundles to, for example /opt/dirg/dirg-util/.
+    :param bundles: Dictionary with bundle name as key and list with source names as value. Defaults to BUNDLES.
+    :param roots: Roots to search for source files, defaults to root.
+    :param minify: Minify files that are not already minified.
+    :return: The bundle manifest, a dictionary with bundle name as key and name of the bundle file as value.
+    """
+    if bundles is None:
+        bundles = BUNDLES
+    if roots is None:
+        roots = [root]
+    folder = os.path.join(root, BUNDLE_FOLDER)
+    if not os.path.isdir(folder):
+        os.makedirs(folder)
+    manifest = {}
+    for name, sources in bundles.iteritems():
+        base, kind = name.rsplit(".", 1)
+        content = bundle_content(sources, kind, roots, minify)
+        filename = "%s.%s.%s" % (base, hashlib.sha1(content).hexdigest()[:12], kind)
+        path = os.path.join(folder, filename)
+        if not os.path.isfile(path):
+            with open(path + ".tmp", "wb") as _file:
+                _file.write(content)
+            os.rename(path + ".tmp", path)
+        manifest[name] = "%s/%s" % (BUNDLE_FOLDER, filename)
+    with open(os.path.join(folder, MANIFEST_FILE + ".tmp"), "w") as _file:
+        json.dump(manifest, _file, indent=2, sort_keys=True)
+    os.rename(os.path.join(folder, MANIFEST_FILE + ".tmp"), os.path.join(folder, MANIFEST_FILE))
+    return manifest
+
+
+def load_manifest(reload=False):
+    """
+    :param reload: Read the manifest again.
+    :return: The bundle manifest of the first root that has one, or an empty dictionary.
+    """
+    global _manifest
+    if _manifest is None or reload:
+        manifest = {}
+        path = find_source("%s/%s" % (BUNDLE_FOLDER, MANIFEST_FILE))
+        if path is not None:
+            with open(path) as _file:
+                manifest = json.load(_file)
+        _manifest = manifest
+    return _manifest
+
+
+def bundle_urls(name):
+    """
+    :param name: Bundle name, for example head.js.
+    :return: The urls to load, the fingerprinted bundle if it has been built, otherwise the source files.
+    """
+    manifest = load_manifest()
+    if name in manifest:
+        return ["/" + manifest[name]]
+    return ["/" + source for source in BUNDLES.get(name, [])]
+
+
+def bundle_tags(name):
+    """
+    Mako helper that emits the script or link tags for a bundle.
+    :param name: Bundle name, for example head.js.
+    :return: HTML.
+    """
+    if name.endswith(".css"):
+        if name in MEDIA:
+            tag = '<link rel="stylesheet" type="text/css" href="%%s" media="%s">' % MEDIA[name]
+        else:
+            tag = '<link rel="stylesheet" type="text/css" href="%s">'
+    else:
+        tag = '<script src="%s"></script>'
+    return "\n".join(tag % url for url in bundle_urls(name))
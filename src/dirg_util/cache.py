@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Umeå University
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+A small thread safe LRU cache, bounded by number of entries and/or by the
+total size of the stored values.
+"""
+import threading
+from collections import OrderedDict
+
+
+class LRUCache(object):
+    def __init__(self, max_entries=None, max_size=None, sizeof=len):
+        """
+        :param max_entries: Maximum number of entries, None for no limit.
+        :param max_size: Maximum total size of all values, None for no limit.
+        :param sizeof: Function that returns the size of a value. Only used if max_size is given.
+        """
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.size = 0
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Get a value and mark it as the most recently used.
+        :param key: The key.
+        :param default: Returned if the key is not in the cache.
+        :return: The cached value or default.
+        """
+        with self.lock:
+            try:
+                value = self.data.pop(key)
+            except KeyError:
+                return default
+            self.data[key] = value
+            return value
+
+    def set(self, key, value):
+        """
+        Add a value to the cache, evicting the least recently used values if a limit is exceeded.
+        A value larger than max_size is not stored at all.
+        :param key: The key.
+        :param value: The value.
+        """
+        size = 0
+        if self.max_size is not None:
+            size = self.sizeof(value)
+            if size > self.max_size:
+                self.pop(key)
+                return
+        with self.lock:
+            self._remove(key)
+            self.data[key] = value
+            self.size += size
+            while (self.max_entries is not None and len(self.data) > self.max_entries) or \
+                    (self.max_size is not None and self.size > self.max_size):
+                self._remove(next(iter(self.data)))
+
+    def pop(self, key, default=None):
+        """
+        Remove a value from the cache.
+        :param key: The key.
+        :param default: Returned if the key is not in the cache.
+        :return: The removed value or default.
+        """
+        with self.lock:
+            return self._remove(key, default)
+
+    def clear(self):
+        with self.lock:
+            self.data.clear()
+            self.size = 0
+
+    def _remove(self, key, default=None):
+        try:
+            value = self.data.pop(key)
+        except KeyError:
+            return default
+        if self.max_size is not None:
+            self.size -= self.sizeof(value)
+        return value
+
+    def __getitem__(self, key):
+        value = self.get(key, self)
+        if value is self:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self.set(key, value)
+
+    def __delitem__(self, key):
+        if self.pop(key, self) is self:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self.data
+
+    def __len__(self):
+        return len(self.data)
@@ -1,3 +1,4 @@
+import logging
 import time
 
 __author__ = 'haho0032'
@@ -10,6 +11,9 @@ from sqlite3 import dbapi2 as sqlite
 import UserDict
 import ldap
 from _ldap import SCOPE_SUBTREE
+from dirg_util.offload import get_pool, OffloadRejected, OffloadTimeout
+
+logger = logging.getLogger("dirg_util.dict")
 
 
 class Sqllite3Dict(UserDict.DictMixin):
@@ -74,7 +78,7 @@ class TooWideLDAPSearchException(Exception):
 class LDAPDict(UserDict.DictMixin):
     def __init__(self, ldapuri, base, filter_pattern, scope=SCOPE_SUBTREE, attr=None, user="", passwd="",
                  firsonly=False, keymap=None, attrsonly=False, static_values=None, exact_match=False,
-                 firstonly_len1=False, timeout=15):
+                 firstonly_len1=False, timeout=15, pool=None):
         """
         :param ldapuri: Url to your ldap server. ldaps://ldap.server.com
         :param base: Base for your ldap search. For example "dc=domain, dc=com"
@@ -90,6 +94,10 @@ class LDAPDict(UserDict.DictMixin):
         :param exact_match: Only attributes that match exactly with the the attr list will be returned.
         :param firstonly_len1: If a LDAP attribute only contains one element, return the first value.
         :param timeout: Time in minutes before a key is removed from the cache and a new LDAP call is performed.
+        :param pool: Name of a thread pool in dirg_util.offload that bounds the number of concurrent LDAP searches,
+            or None to search in the calling thread. The pool is a bulkhead, not asynchronous I/O: the caller still
+            waits for the search. A search the pool rejects or does not finish in time raises KeyError, like a
+            missing key.
         """
         self.ldapuri = ldapuri
         self.base = base
@@ -107,12 +115,46 @@ class LDAPDict(UserDict.DictMixin):
         self.timeout=timeout*60
         self.cache_timeout = {}
         self.cache = {}
+        self.pool = pool
 
     def bind(self):
         self.ld = ldap.initialize(self.ldapuri)
         self.ld.protocol_version = ldap.VERSION3
         self.ld.simple_bind_s(self.ldapuser, self.ldappasswd)
 
+    def unbind(self):
+        try:
+            self.ld.unbind_s()
+        except:
+            pass
+        self.ld = None
+
+    def warm(self, keys):
+        """
+        Fetches keys into the cache, for example before worker processes are forked. The searches are made in the
+        calling thread, and the connection is closed afterwards so it is not shared by the processes.
+        :param keys: The keys to fetch.
+        """
+        pool = self.pool
+        self.pool = None
+        try:
+            for key in keys:
+                self[key]
+        finally:
+            self.pool = pool
+            self.unbind()
+
+    def search(self, arg):
+        try:
+            return self.ld.search_s(*arg)
+        except:
+            try:
+                self.ld.close()
+            except:
+                pass
+            self.bind()
+            return self.ld.search_s(*arg)
+
     def __getitem__(self, key):
         if key in self.cache and key in self.cache_timeout:
             if (time.time() - self.cache_timeout[key]) > self.timeout:
@@ -123,15 +165,14 @@ class LDAPDict(UserDict.DictMixin):
 
         _filter = self.filter_pattern % key
         arg = [self.base, self.scope, _filter, self.attr, self.attrsonly]
-        try:
-            result = self.ld.search_s(*arg)
-        except:
+        if self.pool is None:
+            result = self.search(arg)
+        else:
             try:
-                self.ld.close()
-            except:
-                pass
-            self.bind()
-            result = self.ld.search_s(*arg)
+                result = get_pool(self.pool).call(self.search, arg)
+            except (OffloadRejected, OffloadTimeout) as error:
+                logger.warning("LDAP search for %s failed: %s", _filter, error)
+                raise KeyError(key)
         if len(result) == 1:
             # should only be one entry and the information per entry is
             # the tuple (dn, ava)
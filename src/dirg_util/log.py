@@ -13,30 +13,278 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import atexit
+import itertools
 import logging
-from logging.handlers import BufferingHandler
+import os
+import Queue
+import threading
+from logging.handlers import RotatingFileHandler
 
+#Default maximum number of records waiting for the writer thread.
+QUEUE_SIZE = 10000
+#Default maximum number of records written before the file is flushed.
+BATCH_SIZE = 100
+#Seconds a record of level WARNING or higher waits for room in a full queue.
+BLOCK_TIMEOUT = 0.1
 
-def create_logger(filename):
+_STOP = object()
+_listeners = []
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Passes one of every rate request records. A request record is a record with a duration attribute, as logged by
+    dirg_util.http_util.log_request. Records of level WARNING or higher, requests with a 5xx status and requests
+    that took at least slow seconds are always passed, and so are all other records.
+    """
+
+    def __init__(self, rate=10, slow=1.0, name=""):
+        """
+        :param rate: Pass one of every rate request records.
+        :param slow: Seconds after which a request is always logged, None to not log slow requests.
+        """
+        logging.Filter.__init__(self, name)
+        self.rate = rate
+        self.slow = slow
+        self.counter = itertools.count()
+
+    def filter(self, record):
+        duration = getattr(record, "duration", None)
+        if duration is None or record.levelno >= logging.WARNING:
+            return True
+        if self.slow is not None and duration >= self.slow:
+            return True
+        if str(getattr(record, "status", None) or "").startswith("5"):
+            return True
+        return next(self.counter) % self.rate == 0
+
+
+class BatchRotatingFileHandler(RotatingFileHandler):
+    """
+    A RotatingFileHandler that only flushes the file when flush_batch is called, not for every record.
+    """
+
+    def flush(self):
+        pass
+
+    def flush_batch(self):
+        self.acquire()
+        try:
+            if self.stream:
+                self.stream.flush()
+        finally:
+            self.release()
+
+
+class QueueListener(object):
+    """
+    Writer thread that takes log records from a queue and passes them to handlers.
+    """
+
+    def __init__(self, handlers, queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE):
+        """
+        :param handlers: The handlers that write the records.
+        :param queue_size: Maximum number of records waiting.
+        :param batch_size: Maximum number of records handled before the handlers are flushed.
+        """
+        self.handlers = handlers
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.queue = None
+        self.thread = None
+        self.pid = None
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Starts the writer thread, and starts it again in a forked process.
+        """
+        with self._lock:
+            if self.pid != os.getpid():
+                self.queue = Queue.Queue(self.queue_size)
+                self.dropped = 0
+                self.thread = threading.Thread(target=self._run, args=(self.queue,), name="log-writer")
+                self.thread.daemon = True
+                self.thread.start()
+                self.pid = os.getpid()
+
+    def stop(self):
+        """
+        Writes the waiting records and stops the writer thread.
+        """
+        with self._lock:
+            if self.pid == os.getpid() and self.thread is not None:
+                self.queue.put(_STOP)
+                self.thread.join()
+            self.thread = None
+            self.pid = None
+
+    def _run(self, queue):
+        reported = 0
+        while True:
+            batch = [queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(queue.get_nowait())
+                except Queue.Empty:
+                    break
+            stop = False
+            for record in batch:
+                if record is _STOP:
+                    stop = True
+                else:
+                    self.handle(record)
+            dropped = self.dropped
+            if dropped != reported:
+                self.handle(logging.makeLogRecord({
+                    "name": "dirg_util.log", "levelno": logging.WARNING, "levelname": "WARNING",
+                    "msg": "%d log records dropped, the log queue was full." % (dropped - reported)}))
+                reported = dropped
+            for handler in self.handlers:
+                if hasattr(handler, "flush_batch"):
+                    handler.flush_batch()
+                else:
+                    handler.flush()
+            if stop:
+                return
+
+    def handle(self, record):
+        for handler in self.handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+
+class QueueHandler(logging.Handler):
+    """
+    Handler that puts the records on the queue of a QueueListener.
+    """
+
+    def __init__(self, listener, block_timeout=BLOCK_TIMEOUT):
+        """
+        :param listener: The QueueListener.
+        :param block_timeout: Seconds a record of level WARNING or higher waits for room in a full queue.
+        """
+        logging.Handler.__init__(self)
+        self.listener = listener
+        self.block_timeout = block_timeout
+
+    def prepare(self, record):
+        # The message is formatted here, the arguments may change after the call. The traceback is formatted since
+        # it can not be kept.
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging._defaultFormatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        listener = self.listener
+        if listener.pid != os.getpid():
+            listener.start()
+        try:
+            record = self.prepare(record)
+            if record.levelno >= logging.WARNING:
+                listener.queue.put(record, True, self.block_timeout)
+            else:
+                listener.queue.put_nowait(record)
+        except Queue.Full:
+            listener.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        # Called by logging.shutdown, the waiting records are written before the process exits.
+        self.listener.stop()
+        logging.Handler.close(self)
+
+
+def _stop_listeners():
+    for listener in _listeners:
+        listener.stop()
+
+
+atexit.register(_stop_listeners)
+
+
+def before_fork():
+    """
+    Python 2 logging does not reset its locks in a forked process. Processes that fork call before_fork, and
+    after_fork_parent or after_fork_child after the fork, like dirg_util.runner does.
+
+    Writes the waiting records and stops the writer threads, so no thread holds a handler lock during the fork.
+    Until after_fork_parent or after_fork_child is called, a thread that logs waits.
+    """
+    for listener in _listeners:
+        listener.stop()
+        listener._lock.acquire()
+
+
+def after_fork_parent():
+    """
+    Starts the writer threads again in the process that forked.
+    """
+    for listener in _listeners:
+        listener._lock.release()
+        listener.start()
+
+
+def after_fork_child():
+    """
+    Creates new locks for the logging module and all handlers, and starts the writer threads in a forked process.
+    """
+    logging._lock = threading.RLock()
+    for ref in logging._handlerList:
+        handler = ref()
+        if handler is not None:
+            handler.createLock()
+    for listener in _listeners:
+        listener._lock = threading.Lock()
+        listener.start()
+
+
+def disable_rotation():
+    """
+    Turns off size based rotation in all RotatingFileHandlers. Processes that append to the same file must not rotate
+    it, each would rotate it on its own.
+    :return: The names of the files that were rotated.
+    """
+    filenames = []
+    for ref in logging._handlerList:
+        handler = ref()
+        if isinstance(handler, RotatingFileHandler) and handler.maxBytes > 0:
+            handler.maxBytes = 0
+            filenames.append(handler.baseFilename)
+    return filenames
+
+
+def create_logger(filename, level=logging.DEBUG, max_bytes=10 * 1024 * 1024, backup_count=5,
+                  queue_size=QUEUE_SIZE, batch_size=BATCH_SIZE, sample_rate=None, slow=1.0):
     """
     Creates a logger with a given filename.
     :param filename: File name for the log
+    :param level: Level of the logger.
+    :param max_bytes: Size in bytes at which the file is rotated, 0 to never rotate.
+    :param backup_count: Number of rotated files kept.
+    :param queue_size: Maximum number of records waiting to be written.
+    :param batch_size: Maximum number of records written before the file is flushed.
+    :param sample_rate: Log one of every sample_rate requests, None to log all requests. See SamplingFilter.
+    :param slow: Seconds after which a request is always logged when requests are sampled.
     :return: A logger class.
     """
     logger = logging.getLogger("")
-    logfile_name = filename
-    handler = logging.FileHandler(logfile_name)
+    handler = BatchRotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count)
     base_formatter = logging.Formatter(
         "%(asctime)s %(name)s:%(levelname)s %(message)s")
-    cpc = ('%(asctime)s %(name)s:%(levelname)s '
-           '[%(client)s,%(path)s,%(cid)s] %(message)s')
     handler.setFormatter(base_formatter)
-    logger.addHandler(handler)
-    logger.setLevel(logging.DEBUG)
-    _formatter = logging.Formatter(cpc)
-    fil_handler = logging.FileHandler(logfile_name)
-    fil_handler.setFormatter(_formatter)
-
-    buf_handler = BufferingHandler(10000)
-    buf_handler.setFormatter(_formatter)
+    listener = QueueListener([handler], queue_size, batch_size)
+    listener.start()
+    _listeners.append(listener)
+    queue_handler = QueueHandler(listener)
+    if sample_rate:
+        queue_handler.addFilter(SamplingFilter(sample_rate, slow))
+    logger.addHandler(queue_handler)
+    logger.setLevel(level)
     return logger
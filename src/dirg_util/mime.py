@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Umeå University
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Content types for file endings, read from mime_types.txt.
+"""
+import os
+
+MIME_TYPES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mime_types.txt")
+
+_types = None
+
+
+def load(filename=MIME_TYPES_FILE):
+    """
+    Reads a content type table.
+    :param filename: File with one "ending content-type" pair per line. Lines starting with # are ignored.
+    :return: Dictionary with file ending, for example ".js", as key and content type as value.
+    """
+    table = {}
+    with open(filename) as _file:
+        for line in _file:
+            if line.startswith("#"):
+                continue
+            parts = line.split()
+            if len(parts) == 2:
+                table[parts[0]] = parts[1]
+    return table
+
+
+def types():
+    """
+    :return: The content type table, loaded on the first call.
+    """
+    global _types
+    if _types is None:
+        _types = load()
+    return _types
+
+
+def content_type(path, default=None):
+    """
+    Finds the content type for a file.
+    :param path: File name or path.
+    :param default: Returned if the file ending is unknown.
+    :return: The content type.
+    """
+    ending = os.path.splitext(path)[1]
+    return types().get(ending.lower(), default)
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Umeå University
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Bounded thread pools for blocking calls to other servers, like CAS ticket validation and LDAP searches. A pool
+is a bulkhead, not asynchronous I/O: the caller still waits for the result.
+"""
+import logging
+import os
+import sys
+import threading
+import Queue
+
+logger = logging.getLogger("dirg_util.offload")
+
+#Default number of threads in a pool.
+DEFAULT_MAX_WORKERS = 4
+#Default number of calls that may wait for a thread.
+DEFAULT_MAX_QUEUE = 16
+#Default number of seconds a caller waits for the result.
+DEFAULT_TIMEOUT = 30
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class OffloadRejected(Exception):
+    pass
+
+
+class OffloadTimeout(Exception):
+    pass
+
+
+class _Task(object):
+    __slots__ = ("func", "args", "kwargs", "done", "value", "exc_info")
+
+    def __init__(self, func, args, kwargs):
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.done = threading.Event()
+        self.value = None
+        self.exc_info = None
+
+    def run(self):
+        try:
+            self.value = self.func(*self.args, **self.kwargs)
+        except Exception:
+            self.exc_info = sys.exc_info()
+        self.done.set()
+
+    def result(self, timeout):
+        if not self.done.wait(timeout):
+            raise OffloadTimeout("No result from %s within %s seconds." % (self.func, timeout))
+        if self.exc_info is not None:
+            raise self.exc_info[0], self.exc_info[1], self.exc_info[2]
+        return self.value
+
+
+class ThreadPool(object):
+    def __init__(self, name, max_workers=DEFAULT_MAX_WORKERS, max_queue=DEFAULT_MAX_QUEUE, timeout=DEFAULT_TIMEOUT):
+        """
+        :param name: Name of the pool, used for the thread names and in log messages.
+        :param max_workers: Number of threads.
+        :param max_queue: Number of calls that may wait for a thread.
+        :param timeout: Default number of seconds call waits for the result, None to wait forever.
+        """
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._tasks = None
+        self._slots = None
+        self._workers = []
+        self._pid = None
+
+    def _start(self):
+        # The threads are started on first use, and again in a forked process since threads are not copied by fork.
+        with self._lock:
+            if self._pid != os.getpid():
+                self._tasks = Queue.Queue()
+                # One slot for every call that is running or waiting.
+                self._slots = threading.Semaphore(self.max_workers + self.max_queue)
+                self._workers = []
+                for number in range(self.max_workers):
+                    worker = threading.Thread(target=self._work, args=(self._tasks, self._slots),
+                                              name="%s-%d" % (self.name, number))
+                    worker.daemon = True
+                    worker.start()
+                    self._workers.append(worker)
+                self._pid = os.getpid()
+
+    @staticmethod
+    def _work(tasks, slots):
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            try:
+                task.run()
+            finally:
+                slots.release()
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Starts a call in the pool.
+        :return: A task, task.result(timeout) returns the result or raises the exception of the call.
+        :raise OffloadRejected: If too many calls are waiting.
+        """
+        if self._pid != os.getpid():
+            self._start()
+        if not self._slots.acquire(False):
+            logger.warning("Thread pool %s is full, call to %s rejected.", self.name, func)
+            raise OffloadRejected("Thread pool %s is full." % self.name)
+        task = _Task(func, args, kwargs)
+        self._tasks.put(task)
+        return task
+
+    def call(self, func, *args, **kwargs):
+        """
+        Calls a function in the pool and waits for the result at most timeout seconds.
+        :return: The result of the function.
+        :raise OffloadRejected: If too many calls are waiting.
+        :raise OffloadTimeout: If there is no result within the timeout. The call itself is not interrupted.
+        """
+        return self.submit(func, *args, **kwargs).result(self.timeout)
+
+    def shutdown(self):
+        """
+        Stops the threads when the calls already submitted are done.
+        """
+        with self._lock:
+            if self._pid == os.getpid():
+                for _ in self._workers:
+                    self._tasks.put(None)
+            self._pid = None
+
+
+def configure(name, max_workers=DEFAULT_MAX_WORKERS, max_queue=DEFAULT_MAX_QUEUE, timeout=DEFAULT_TIMEOUT):
+    """
+    Creates or replaces a pool.
+    :return: The pool.
+    """
+    pool = ThreadPool(name, max_workers, max_queue, timeout)
+    with _pools_lock:
+        old = _pools.get(name)
+        _pools[name] = pool
+    if old is not None:
+        old.shutdown()
+    return pool
+
+
+def get_pool(name):
+    """
+    :param name: Name of the pool, for example "cas" or "ldap".
+    :return: The pool, created with the default limits on the first call.
+    """
+    try:
+        return _pools[name]
+    except KeyError:
+        with _pools_lock:
+            if name not in _pools:
+                _pools[name] = ThreadPool(name)
+            return _pools[name]
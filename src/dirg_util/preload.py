@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Umeå University
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Finds the scripts and style sheets a Mako template depends on, for Link: rel=preload headers.
+"""
+import logging
+import re
+
+from dirg_util.bundle import bundle_urls
+
+logger = logging.getLogger("dirg_util.preload")
+
+SCRIPT_TAG = re.compile(r"""<script\b[^>]*\bsrc\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+LINK_TAG = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+LINK_HREF = re.compile(r"""\bhref\s*=\s*["']([^"']+)["']""", re.IGNORECASE)
+LINK_STYLESHEET = re.compile(r"""\brel\s*=\s*["']?stylesheet""", re.IGNORECASE)
+BUNDLE_CALL = re.compile(r"""bundle_tags\(\s*["']([^"']+)["']\s*\)""")
+TEMPLATE_REFERENCE = re.compile(r"""<%(?:inherit|include)\s+file\s*=\s*["']([^"']+)["']""")
+ASSET = re.compile("|".join([SCRIPT_TAG.pattern, LINK_TAG.pattern, BUNDLE_CALL.pattern]), re.IGNORECASE)
+
+_dependencies = {}
+
+
+def template_dependencies(lookup, uri, _seen=None):
+    """
+    Extracts the assets of a template and the templates it inherits from or includes.
+    :param lookup: Mako TemplateLookup.
+    :param uri: Template name.
+    :return: List of tuples (url, "script" or "style"), in document order.
+    """
+    if _seen is None:
+        _seen = set()
+    if uri in _seen:
+        return []
+    _seen.add(uri)
+    source = lookup.get_template(uri).source
+    dependencies = []
+    for reference in TEMPLATE_REFERENCE.findall(source):
+        if "${" not in reference:
+            dependencies.extend(template_dependencies(lookup, lookup.adjust_uri(reference, uri), _seen))
+    for match in ASSET.finditer(source):
+        text = match.group(0)
+        if text.startswith("bundle_tags"):
+            name = BUNDLE_CALL.match(text).group(1)
+            kind = "style" if name.endswith(".css") else "script"
+            dependencies.extend((url, kind) for url in bundle_urls(name))
+        elif text.lower().startswith("<script"):
+            dependencies.append((SCRIPT_TAG.match(text).group(1), "script"))
+        elif LINK_STYLESHEET.search(text):
+            href = LINK_HREF.search(text)
+            if href is not None:
+                dependencies.append((href.group(1), "style"))
+    return dependencies
+
+
+def preload_links(lookup, uri):
+    """
+    Creates a Link header value that preloads the local assets of a template.
+    :param lookup: Mako TemplateLookup.
+    :param uri: Template name.
+    :return: Link header value or None if the template has no local assets.
+    """
+    key = (id(lookup), uri)
+    try:
+        return _dependencies[key]
+    except KeyError:
+        pass
+    links = []
+    try:
+        for url, kind in template_dependencies(lookup, uri):
+            link = "<%s>; rel=preload; as=%s" % (url, kind)
+            if url.startswith("/") and not url.startswith("//") and "${" not in url and link not in links:
+                links.append(link)
+    except Exception:
+        logger.warning("Could not extract the assets of template %s.", uri, exc_info=True)
+    _dependencies[key] = ", ".join(links) or None
+    return _dependencies[key]
+
+
+def send_early_hints(environ, links):
+    """
+    Sends a 103 Early Hints response on servers that support it. The server provides a callable in
+    environ["wsgi.early_hints"] that takes a list of headers.
+    :param environ: The WSGI environment.
+    :param links: Link header value.
+    """
+    early_hints = environ.get("wsgi.early_hints")
+    if early_hints is not None and links:
+        try:
+            early_hints([("Link", links)])
+        except Exception:
+            logger.debug("Could not send early hints.", exc_info=True)
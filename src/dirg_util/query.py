@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Umeå University
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Parser for URL encoded query strings and form bodies, with limits on the number and length of the fields.
+"""
+from urllib import unquote_plus
+
+#Default maximum number of fields.
+MAX_FIELDS = 1000
+#Default maximum length of an encoded key or value.
+MAX_LENGTH = 64 * 1024
+
+
+class QueryLimitExceeded(ValueError):
+    pass
+
+
+def _unquote(value):
+    if "%" in value or "+" in value:
+        return unquote_plus(value)
+    return value
+
+
+def parse_query(query, multi=False, keep_blank_values=False, max_fields=MAX_FIELDS, max_length=MAX_LENGTH,
+                strict_parsing=False):
+    """
+    Parses a URL encoded string.
+    :param query: The query string or URL encoded body.
+    :param multi: If True every value is a list, like urlparse.parse_qs. Otherwise a value is a string, or a list
+        if the key is repeated.
+    :param keep_blank_values: Keep fields with empty values.
+    :param max_fields: Maximum number of fields, None for no limit.
+    :param max_length: Maximum length of an encoded key or value, None for no limit.
+    :param strict_parsing: Raise ValueError for fields without a value.
+    :return: A dictionary with the parameters.
+    :raise QueryLimitExceeded: If a limit is exceeded.
+    """
+    result = {}
+    if not query:
+        return result
+    if ";" in query:
+        query = query.replace(";", "&")
+    count = 0
+    start = 0
+    end = len(query)
+    while start <= end:
+        # Empty fields, like after a trailing &, are skipped before they are counted.
+        index = query.find("&", start)
+        if index < 0:
+            index = end
+        field = query[start:index]
+        start = index + 1
+        if not field:
+            continue
+        count += 1
+        if max_fields is not None and count > max_fields:
+            raise QueryLimitExceeded("More than %d fields." % max_fields)
+        name, sep, value = field.partition("=")
+        if not sep and strict_parsing:
+            raise ValueError("Bad query field: %r" % field)
+        if not value and not keep_blank_values:
+            continue
+        if max_length is not None and (len(name) > max_length or len(value) > max_length):
+            raise QueryLimitExceeded("Field longer than %d characters." % max_length)
+        name = _unquote(name)
+        value = _unquote(value)
+        if multi:
+            try:
+                result[name].append(value)
+            except KeyError:
+                result[name] = [value]
+        elif name in result:
+            if isinstance(result[name], list):
+                result[name].append(value)
+            else:
+                result[name] = [result[name], value]
+        else:
+            result[name] = value
+    return result
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Umeå University
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+In-memory rate limiting of login attempts with token buckets. The state is kept per process.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger("dirg_util.ratelimit")
+
+
+class RateLimited(Exception):
+    pass
+
+
+class TokenBucketLimiter(object):
+    def __init__(self, rate, burst, shards=16, max_keys=100000):
+        """
+        :param rate: Tokens added to a bucket per second.
+        :param burst: Maximum number of tokens in a bucket.
+        :param shards: Number of independently locked parts of the state.
+        :param max_keys: Maximum number of buckets kept, the least recently used buckets are dropped.
+        """
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_shard_keys = max(max_keys // shards, 1)
+        self.shards = [(threading.Lock(), OrderedDict()) for _ in range(shards)]
+
+    def allow(self, key, cost=1):
+        """
+        Takes tokens from the bucket of a key.
+        :param key: The key, for example a client address.
+        :param cost: Number of tokens to take.
+        :return: True if the bucket had enough tokens, False if the attempt should be rejected.
+        """
+        return self._take(key, cost, True)
+
+    def check(self, key, cost=1):
+        """
+        Checks the bucket of a key without taking any tokens.
+        :param key: The key, for example a username.
+        :param cost: Number of tokens needed.
+        :return: True if the bucket has enough tokens.
+        """
+        return self._take(key, cost, False)
+
+    def _take(self, key, cost, take):
+        now = time.time()
+        lock, buckets = self.shards[hash(key) % len(self.shards)]
+        with lock:
+            bucket = buckets.pop(key, None)
+            if bucket is None:
+                if not take:
+                    return self.burst >= cost
+                tokens = self.burst
+                if len(buckets) >= self.max_shard_keys:
+                    buckets.popitem(last=False)
+            else:
+                tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            allowed = tokens >= cost
+            if allowed and take:
+                tokens -= cost
+            # The bucket is inserted last, so the first bucket is always the least recently used.
+            buckets[key] = (tokens, now)
+        return allowed
+
+    def reset(self, key):
+        """
+        Fills the bucket of a key.
+        """
+        lock, buckets = self.shards[hash(key) % len(self.shards)]
+        with lock:
+            buckets.pop(key, None)
+
+    def __len__(self):
+        return sum(len(buckets) for lock, buckets in self.shards)
+
+
+def client_address(environ, trusted_proxies=()):
+    """
+    Finds the address of the client. Behind a trusted proxy the address is taken from X-Forwarded-For.
+    :param environ: The WSGI environment.
+    :param trusted_proxies: Addresses of the proxies in front of the server.
+    :return: The address.
+    """
+    address = environ.get("REMOTE_ADDR")
+    if address in trusted_proxies and environ.get("HTTP_X_FORWARDED_FOR"):
+        # The last address that is not a trusted proxy is the client, addresses before it can be forged.
+        for forwarded in reversed(environ["HTTP_X_FORWARDED_FOR"].split(",")):
+            address = forwarded.strip()
+            if address not in trusted_proxies:
+                break
+    return address
+
+
+class RateLimiter(object):
+    def __init__(self, ip_rate=1.0, ip_burst=20, user_rate=0.1, user_burst=5, shards=16, max_keys=100000,
+                 trusted_proxies=()):
+        """
+        :param ip_rate: Attempts per second allowed from a client address, over time.
+        :param ip_burst: Attempts allowed from a client address at once.
+        :param user_rate: Failed attempts per second allowed for a username, over time.
+        :param user_burst: Failed attempts allowed for a username at once.
+        :param shards: Number of independently locked parts of the state.
+        :param max_keys: Maximum number of addresses and of usernames kept.
+        :param trusted_proxies: Addresses of the proxies in front of the server, see client_address.
+        """
+        self.ip = TokenBucketLimiter(ip_rate, ip_burst, shards, max_keys)
+        self.user = TokenBucketLimiter(user_rate, user_burst, shards, max_keys)
+        self.trusted_proxies = frozenset(trusted_proxies)
+
+    def client_address(self, environ):
+        return client_address(environ, self.trusted_proxies)
+
+    def allow(self, address=None, username=None):
+        """
+        Checks a login attempt. The attempt takes a token from the bucket of the address, but only failed attempts
+        take tokens from the bucket of the username, see failed.
+        :param address: The client address, or None.
+        :param username: The username, or None.
+        :return: True if the attempt is allowed.
+        """
+        if address is not None and not self.ip.allow(address):
+            logger.warning("Too many login attempts from %s.", address)
+            return False
+        if username is not None and not self.user.check(username):
+            logger.warning("Too many failed login attempts for user %s.", username)
+            return False
+        return True
+
+    def failed(self, username):
+        """
+        Counts a failed login attempt for a username.
+        :param username: The username.
+        """
+        self.user.allow(username)
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Umeå University
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+URL router for applications built on HttpHandler.
+"""
+import re
+
+PARAMETER = re.compile(r"^<([a-zA-Z_][a-zA-Z0-9_]*)(?::([a-zA-Z_]+))?>$")
+#Methods a route without methods accepts.
+ANY_METHOD = "*"
+
+
+class RouteNotFound(Exception):
+    pass
+
+
+class RouteMethodNotAllowed(Exception):
+    def __init__(self, allowed):
+        """
+        :param allowed: List of the methods the path accepts.
+        """
+        Exception.__init__(self, "Method not allowed, use one of %s." % ", ".join(allowed))
+        self.allowed = allowed
+
+
+def _str(value):
+    if not value:
+        raise ValueError("Empty segment.")
+    return value
+
+
+def _int(value):
+    if not value.isdigit():
+        raise ValueError("Not an integer: %s" % value)
+    return int(value)
+
+
+#Functions that convert a path segment to a parameter value, they raise ValueError if the segment does not match.
+CONVERTERS = {
+    "str": _str,
+    "int": _int,
+    "float": float,
+    "path": _str,
+}
+
+
+class _Node(object):
+    __slots__ = ("static", "parameters", "rest", "handlers")
+
+    def __init__(self):
+        #Segment text -> node.
+        self.static = {}
+        #List of tuples (name, converter, node).
+        self.parameters = []
+        #Tuple (name, converter, handlers) for a path parameter, or None.
+        self.rest = None
+        #Method -> handler for routes that end at this node.
+        self.handlers = {}
+
+
+class Router(object):
+    def __init__(self, converters=None):
+        """
+        :param converters: Dictionary with extra parameter types, type name as key and a function that converts a
+            path segment, or raises ValueError, as value.
+        """
+        self.converters = dict(CONVERTERS)
+        if converters:
+            self.converters.update(converters)
+        self.root = _Node()
+        self.routes = []
+        #Path -> handlers for the routes without parameters, built by freeze.
+        self.static_routes = {}
+        self.frozen = False
+
+    def add(self, pattern, handler, methods=None):
+        """
+        Adds a route.
+        :param pattern: The path, for example "user/<uid:int>". A leading / is ignored.
+        :param handler: Anything, returned by match.
+        :param methods: List of HTTP methods, None for all methods. A GET route also answers HEAD.
+        """
+        if self.frozen:
+            raise RuntimeError("Routes can not be added to a frozen router.")
+        if methods is None:
+            methods = [ANY_METHOD]
+        else:
+            methods = [method.upper() for method in methods]
+            if "GET" in methods and "HEAD" not in methods:
+                methods.append("HEAD")
+        node = self.root
+        segments = pattern.lstrip("/").split("/")
+        handlers = None
+        for index, segment in enumerate(segments):
+            match = PARAMETER.match(segment)
+            if match is None:
+                node = node.static.setdefault(segment, _Node())
+                continue
+            name, kind = match.group(1), match.group(2) or "str"
+            try:
+                converter = self.converters[kind]
+            except KeyError:
+                raise ValueError("Unknown parameter type %s in route %s." % (kind, pattern))
+            if kind == "path":
+                if index != len(segments) - 1:
+                    raise ValueError("A path parameter must be the last segment of route %s." % pattern)
+                if node.rest is None:
+                    node.rest = (name, converter, {})
+                elif node.rest[0] != name:
+                    raise ValueError("Conflicting parameter name %s in route %s." % (name, pattern))
+                handlers = node.rest[2]
+                break
+            for _name, _converter, child in node.parameters:
+                if _converter is converter:
+                    if _name != name:
+                        raise ValueError("Conflicting parameter name %s in route %s." % (name, pattern))
+                    node = child
+                    break
+            else:
+                child = _Node()
+                node.parameters.append((name, converter, child))
+                node = child
+        if handlers is None:
+            handlers = node.handlers
+        for method in methods:
+            if method in handlers:
+                raise ValueError("Duplicate route %s %s." % (method, pattern))
+            handlers[method] = handler
+        self.routes.append((pattern, methods, handler))
+
+    def route(self, pattern, methods=None):
+        """
+        Decorator that adds a route for a function.
+        :param pattern: The path.
+        :param methods: List of HTTP methods, None for all methods.
+        """
+        def decorator(handler):
+            self.add(pattern, handler, methods)
+            return handler
+        return decorator
+
+    def freeze(self):
+        """
+        Builds a table of the routes without parameters, so they are found with a single dictionary lookup, and
+        stops new routes from being added. Call at startup, after all routes have been added.
+        """
+        nodes = [("", self.root)]
+        while nodes:
+            path, node = nodes.pop()
+            if node.handlers:
+                self.static_routes[path] = node.handlers
+            for segment, child in node.static.iteritems():
+                nodes.append((path + "/" + segment if node is not self.root else segment, child))
+        self.frozen = True
+
+    def _find(self, node, segments, index, params):
+        if index == len(segments):
+            if node.handlers:
+                return node.handlers
+        else:
+            segment = segments[index]
+            child = node.static.get(segment)
+            if child is not None:
+                handlers = self._find(child, segments, index + 1, params)
+                if handlers is not None:
+                    return handlers
+            for name, converter, child in node.parameters:
+                try:
+                    value = converter(segment)
+                except ValueError:
+                    continue
+                handlers = self._find(child, segments, index + 1, params)
+                if handlers is not None:
+                    params[name] = value
+                    return handlers
+        if node.rest is not None and node.rest[2]:
+            name, converter, handlers = node.rest
+            try:
+                params[name] = converter("/".join(segments[index:]))
+            except ValueError:
+                return None
+            return handlers
+        return None
+
+    def match(self, method, path):
+        """
+        Finds the handler for a request.
+        :param method: The HTTP method.
+        :param path: The requested path, for example HttpHandler.path(). A leading / is ignored.
+        :return: A tuple (handler, dictionary with the parameters of the path).
+        :raise RouteNotFound: If no route matches the path.
+        :raise RouteMethodNotAllowed: If routes match the path, but not the method.
+        """
+        path = path.lstrip("/")
+        params = {}
+        handlers = self.static_routes.get(path)
+        if handlers is None:
+            handlers = self._find(self.root, path.split("/"), 0, params)
+            if handlers is None:
+                raise RouteNotFound(path)
+        try:
+            return handlers[method], params
+        except KeyError:
+            pass
+        try:
+            return handlers[ANY_METHOD], params
+        except KeyError:
+            raise RouteMethodNotAllowed(sorted(handlers))
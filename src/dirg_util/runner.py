@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Umeå University
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Pre-fork WSGI server. The warm-up hooks fill the caches once, before the worker processes are forked.
+"""
+import argparse
+import errno
+import gc
+import importlib
+import logging
+import os
+import select
+import signal
+import sys
+import threading
+import time
+from SocketServer import ThreadingMixIn
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler
+
+from dirg_util import log
+from dirg_util import mime
+
+logger = logging.getLogger("dirg_util.runner")
+
+#Seconds a worker may use to finish its requests before it is killed.
+GRACEFUL_TIMEOUT = 30
+#Seconds between checks for stop requests in a worker.
+POLL_INTERVAL = 1
+#Garbage collection thresholds in the workers, see gc.set_threshold. The default is (700, 10, 10). Python 2 can
+#not keep the collector away from the objects the workers share, and a full collection copies their memory, so the
+#workers make full collections rare.
+GC_THRESHOLD = (50000, 20, 100)
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = False
+
+
+class RequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        # address_string does a reverse DNS lookup, the client address is logged as it is.
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s " + format, self.client_address[0], *args)
+
+
+def warm_mime():
+    """
+    Loads the content type table.
+    """
+    mime.types()
+
+
+def warm_static(handler_class, preload=True):
+    """
+    Scans the static folders of an HttpHandler class, without starting the thread that watches them. When the
+    folders have been scanned before, they are scanned again and the files in memory are dropped.
+    :param handler_class: HttpHandler or a subclass.
+    :param preload: Read the small static files into memory.
+    """
+    scanned = handler_class.__dict__.get("_static_files") is not None
+    static = handler_class.static_files(watch=False)
+    if scanned:
+        static.manifest.scan()
+        static.cache.clear()
+    if preload:
+        logger.info("Preloaded %d static files.", static.preload())
+
+
+def start_static_watch(handler_class):
+    """
+    Hook for add_after_fork that starts watching the static folders in a worker.
+    :param handler_class: HttpHandler or a subclass.
+    """
+    from dirg_util.static import pyinotify
+
+    if pyinotify is not None:
+        handler_class.static_files().start_watch()
+
+
+def warm_templates(registry):
+    """
+    Compiles all templates, or the templates that have changed if they have been compiled before.
+    :param registry: A TemplateRegistry.
+    """
+    registry.clear()
+    registry.precompile()
+
+
+def warm_ldap(ldap_dict, keys):
+    """
+    Fetches LDAP entries, for example the service accounts, into the cache.
+    :param ldap_dict: An LDAPDict.
+    :param keys: The keys to fetch.
+    """
+    ldap_dict.warm(keys)
+
+
+def load_application(name):
+    """
+    :param name: "module:attribute", for example "myapp.server:application".
+    :return: The WSGI application.
+    """
+    module, sep, attribute = name.partition(":")
+    return getattr(importlib.import_module(module), attribute or "application")
+
+
+class Runner(object):
+    def __init__(self, application, host="", port=8080, workers=None, graceful_timeout=GRACEFUL_TIMEOUT,
+                 gc_threshold=GC_THRESHOLD):
+        """
+        :param application: The WSGI application.
+        :param host: Address to listen on, "" for all addresses.
+        :param port: Port to listen on.
+        :param workers: Number of worker processes, defaults to the number of processors.
+        :param graceful_timeout: Seconds a worker may use to finish its requests when it is stopped.
+        :param gc_threshold: Garbage collection thresholds in the workers, None to keep the thresholds of the master.
+        """
+        self.application = application
+        self.host = host
+        self.port = port
+        if workers is None:
+            try:
+                import multiprocessing
+                workers = multiprocessing.cpu_count()
+            except (ImportError, NotImplementedError):
+                workers = 2
+        self.workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.gc_threshold = gc_threshold
+        self.warmups = []
+        self.after_fork = []
+        self.server = None
+        #Pid -> generation of the running workers.
+        self.children = {}
+        self.generation = 0
+        self.stopping = False
+        self.reloading = False
+
+    def add_warmup(self, func, *args, **kwargs):
+        """
+        Adds a hook that is run in the master process before the workers are forked, and again on SIGHUP.
+        """
+        self.warmups.append((func, args, kwargs))
+
+    def add_after_fork(self, func, *args, **kwargs):
+        """
+        Adds a hook that is run in every worker process after it has been forked.
+        """
+        self.after_fork.append((func, args, kwargs))
+
+    @staticmethod
+    def _run_hooks(hooks):
+        for func, args, kwargs in hooks:
+            started = time.time()
+            try:
+                func(*args, **kwargs)
+            except Exception:
+                logger.exception("Hook %s failed.", getattr(func, "__name__", func))
+            else:
+                logger.info("Hook %s done in %.2f seconds.", getattr(func, "__name__", func), time.time() - started)
+
+    def warm_up(self):
+        """
+        Runs the warm-up hooks and collects the garbage they left, so it is not copied into every worker.
+        """
+        self._run_hooks(self.warmups)
+        gc.collect()
+
+    def run(self):
+        """
+        Starts the workers and supervises them until SIGTERM or SIGINT. SIGHUP runs the warm-up hooks again and
+        replaces the workers. A worker that dies is replaced.
+        """
+        self.server = ThreadingWSGIServer((self.host, self.port), RequestHandler)
+        self.server.set_app(self.application)
+        self.server.timeout = POLL_INTERVAL
+        logger.info("Listening on %s:%d with %d workers.", self.host, self.port, self.workers)
+        self.warm_up()
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        signal.signal(signal.SIGHUP, self._reload)
+        self._spawn_workers()
+        while not self.stopping:
+            if self.reloading:
+                self.reloading = False
+                self._replace_workers()
+            self._reap()
+            time.sleep(POLL_INTERVAL)
+        self._stop_workers(self.children.keys())
+        self.server.server_close()
+        logger.info("Stopped.")
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+
+    def _reload(self, signum, frame):
+        self.reloading = True
+
+    def _spawn_workers(self):
+        for filename in log.disable_rotation():
+            logger.warning("Size based rotation of %s is turned off, the workers share the file. Rotate it with an "
+                           "external tool.", filename)
+        # The log writer threads are stopped while forking, a worker must not inherit a held handler lock.
+        log.before_fork()
+        try:
+            while sum(1 for generation in self.children.values() if generation == self.generation) < self.workers:
+                self._spawn()
+        finally:
+            log.after_fork_parent()
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid:
+            self.children[pid] = self.generation
+            return
+        status = 0
+        try:
+            log.after_fork_child()
+            if self.gc_threshold is not None:
+                gc.set_threshold(*self.gc_threshold)
+            self._worker()
+        except Exception:
+            logger.exception("Worker %d failed.", os.getpid())
+            status = 1
+        # The worker exits without the exit handlers of the master, write the waiting log records first.
+        logging.shutdown()
+        os._exit(status)
+
+    def _replace_workers(self):
+        logger.info("Reloading.")
+        self.warm_up()
+        old = self.children.keys()
+        self.generation += 1
+        self._spawn_workers()
+        for pid in old:
+            self._kill(pid, signal.SIGTERM)
+
+    def _reap(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except OSError as err:
+                if err.errno == errno.ECHILD:
+                    return
+                raise
+            if not pid:
+                return
+            generation = self.children.pop(pid, None)
+            if generation == self.generation and not self.stopping:
+                logger.warning("Worker %d exited with status %d, starting a new worker.", pid, status)
+                self._spawn_workers()
+
+    @staticmethod
+    def _kill(pid, signum):
+        try:
+            os.kill(pid, signum)
+        except OSError as err:
+            if err.errno != errno.ESRCH:
+                raise
+
+    def _stop_workers(self, pids):
+        for pid in pids:
+            self._kill(pid, signal.SIGTERM)
+        deadline = time.time() + self.graceful_timeout
+        while self.children and time.time() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in self.children.keys():
+            logger.warning("Worker %d did not stop, killing it.", pid)
+            self._kill(pid, signal.SIGKILL)
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, 0)
+            except OSError:
+                break
+            self.children.pop(pid, None)
+
+    def _worker(self):
+        stopping = []
+        signal.signal(signal.SIGTERM, lambda signum, frame: stopping.append(signum))
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        self._run_hooks(self.after_fork)
+        logger.info("Worker %d started.", os.getpid())
+        while not stopping:
+            try:
+                self.server.handle_request()
+            except (OSError, IOError, select.error) as err:
+                if err.args and err.args[0] == errno.EINTR:
+                    continue
+                raise
+        # Wait for the requests that are being handled.
+        deadline = time.time() + self.graceful_timeout
+        for thread in threading.enumerate():
+            if thread is not threading.current_thread() and not thread.daemon:
+                thread.join(max(deadline - time.time(), 0))
+        logger.info("Worker %d stopped.", os.getpid())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-fork WSGI server.")
+    parser.add_argument("application", help="module:attribute of the WSGI application")
+    parser.add_argument("--host", default="", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    runner = Runner(load_application(args.application), args.host, args.port, args.workers)
+    runner.add_warmup(warm_mime)
+    runner.run()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
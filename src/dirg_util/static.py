@@ -0,0 +1,591 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Umeå University
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+Static asset handling used by HttpHandler.handle_static.
+"""
+import gzip
+import logging
+from email.utils import formatdate, mktime_tz, parsedate_tz
+import os
+import posixpath
+import stat
+import time
+from StringIO import StringIO
+
+from dirg_util import mime
+from dirg_util.cache import LRUCache
+
+try:
+    import pyinotify
+except ImportError:
+    pyinotify = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger("dirg_util.static")
+
+#Content encodings with the file suffix of the precompressed variant, in order of preference.
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+#Block size used when streaming large files.
+BLOCK_SIZE = 64 * 1024
+
+#File types that are worth compressing.
+COMPRESS_EXTENSIONS = (".js", ".css", ".html", ".txt", ".json", ".xml", ".svg", ".eot", ".ttf")
+
+
+class StaticEntry(object):
+    """
+    A file in the static manifest.
+    """
+
+    def __init__(self, name, path, size, mtime, content_type, variants=None):
+        """
+        :param name: The name the file is requested with, for example static/angular.js.
+        :param path: Resolved path to the file on disk.
+        :param size: File size in bytes.
+        :param mtime: Modification time of the file.
+        :param content_type: Content type to respond with.
+        :param variants: Dictionary with content encoding as key and path to the precompressed file as value.
+        """
+        self.name = name
+        self.path = path
+        self.size = size
+        self.mtime = mtime
+        self.content_type = content_type
+        self.variants = variants or {}
+        self.etag = '"%x-%x"' % (int(mtime), size)
+        self.last_modified = formatdate(mtime, usegmt=True)
+        self.checked = time.time()
+
+    def paths(self):
+        """
+        :return: The path to the file and all its precompressed variants.
+        """
+        return [self.path] + self.variants.values()
+
+    def variant_etag(self, encoding):
+        """
+        :param encoding: Content encoding of the representation, None for the uncompressed file.
+        :return: The ETag of the representation.
+        """
+        if encoding is None:
+            return self.etag
+        return '%s-%s"' % (self.etag[:-1], encoding)
+
+    def not_modified(self, environ, etag):
+        """
+        Evaluates If-None-Match and If-Modified-Since.
+        :param environ: The WSGI environment.
+        :param etag: The ETag of the selected representation.
+        :return: True if the client has a valid copy of the file.
+        """
+        if_none_match = environ.get("HTTP_IF_NONE_MATCH")
+        if if_none_match:
+            return etag_matches(if_none_match, etag)
+        if_modified_since = environ.get("HTTP_IF_MODIFIED_SINCE")
+        if if_modified_since:
+            date = parsedate_tz(if_modified_since.split(";")[0])
+            if date is not None:
+                try:
+                    return int(self.mtime) <= mktime_tz(date)
+                except (OverflowError, ValueError):
+                    pass
+        return False
+
+    def range_allowed(self, environ, etag):
+        """
+        Evaluates If-Range.
+        :param environ: The WSGI environment.
+        :param etag: The ETag of the selected representation.
+        :return: True if a Range header should be honoured.
+        """
+        if_range = environ.get("HTTP_IF_RANGE")
+        if not if_range:
+            return True
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            return if_range == etag
+        return if_range == self.last_modified
+
+    def variant(self, accept_encoding):
+        """
+        Selects the best representation of the file for a client.
+        :param accept_encoding: The Accept-Encoding header of the request.
+        :return: A tuple (content encoding, path). The encoding is None for the uncompressed file.
+        """
+        if self.variants and accept_encoding:
+            encoding = negotiate_encoding(accept_encoding, self.variants)
+            if encoding is not None:
+                return encoding, self.variants[encoding]
+        return None, self.path
+
+
+class StaticManifest(object):
+    def __init__(self, roots, folders=("static",), content_type=None):
+        """
+        :param roots: List of root directories, in priority order. A requested name is resolved against the roots.
+        :param folders: Folders beneath each root that are scanned at startup.
+        :param content_type: Function that returns the content type for a file name.
+        """
+        self.roots = [os.path.realpath(root or os.curdir) for root in roots]
+        self.folders = folders
+        self.content_type = content_type or mime.content_type
+        self.entries = {}
+        self.scan()
+
+    def scan(self):
+        """
+        Scans all static folders and replaces the manifest.
+        """
+        entries = {}
+        for root in reversed(self.roots):
+            for folder in self.folders:
+                for dirpath, dirnames, filenames in os.walk(os.path.join(root, folder)):
+                    for filename in filenames:
+                        path = os.path.join(dirpath, filename)
+                        name = os.path.relpath(path, root).replace(os.sep, "/")
+                        entry = self.create_entry(name, path)
+                        if entry is not None:
+                            entries[name] = entry
+        self.entries = entries
+        logger.info("Static manifest contains %d files.", len(entries))
+
+    def create_entry(self, name, path):
+        """
+        Creates a manifest entry for a file.
+        :param name: The name the file is requested with.
+        :param path: Path to the file.
+        :return: A StaticEntry or None if the path is not a regular file.
+        """
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        path = os.path.realpath(path)
+        variants = {}
+        for encoding, suffix in ENCODINGS:
+            try:
+                if os.stat(path + suffix).st_mtime >= st.st_mtime:
+                    variants[encoding] = path + suffix
+            except OSError:
+                pass
+        return StaticEntry(name, path, st.st_size, st.st_mtime, self.content_type(name), variants)
+
+    @staticmethod
+    def canonical_name(name):
+        """
+        :param name: Requested name, for example static/./angular.js.
+        :return: The normalized name, for example static/angular.js, or None if the name can not be a static file.
+        """
+        name = posixpath.normpath(name)
+        if name.startswith(("/", "../")) or name in (".", ".."):
+            return None
+        return name
+
+    def lookup(self, name):
+        """
+        Finds the manifest entry for a requested name. The name is normalized first, so variants of a name like
+        static/./angular.js share the entry of static/angular.js. Files added after the scan are resolved against
+        the roots and added to the manifest under their normalized name.
+        :param name: Requested name, for example static/angular.js.
+        :return: A StaticEntry or None if the file does not exist.
+        """
+        entry = self.entries.get(name)
+        if entry is None:
+            name = self.canonical_name(name)
+            if name is None:
+                return None
+            entry = self.entries.get(name)
+            if entry is None:
+                entry = self.resolve(name)
+        return entry
+
+    def resolve(self, name):
+        """
+        :param name: A normalized name, see canonical_name.
+        """
+        entry = self.lookup_path(name)
+        if entry is not None:
+            self.entries[name] = entry
+        return entry
+
+    def lookup_path(self, name):
+        """
+        Resolves a name against the roots. A name may not point outside the static folders.
+        :param name: Requested name.
+        :return: A StaticEntry or None if the file does not exist.
+        """
+        for root in self.roots:
+            path = os.path.realpath(os.path.join(root, name))
+            for folder in self.folders:
+                if path.startswith(os.path.join(root, folder, "")):
+                    entry = self.create_entry(name, path)
+                    if entry is not None:
+                        return entry
+        return None
+
+    def refresh(self, entry):
+        """
+        Updates an entry from the file system.
+        :param entry: A StaticEntry.
+        :return: True if the file was changed or removed, otherwise False.
+        """
+        new_entry = self.lookup_path(entry.name)
+        if new_entry is None:
+            self.entries.pop(entry.name, None)
+            return True
+        if (new_entry.mtime, new_entry.size, new_entry.path, new_entry.variants) == \
+                (entry.mtime, entry.size, entry.path, entry.variants):
+            entry.checked = new_entry.checked
+            return False
+        self.entries[entry.name] = new_entry
+        return True
+
+    def watch_folders(self):
+        """
+        :return: All existing static folders.
+        """
+        folders = []
+        for root in self.roots:
+            for folder in self.folders:
+                path = os.path.join(root, folder)
+                if os.path.isdir(path):
+                    folders.append(path)
+        return folders
+
+
+class StaticFiles(object):
+    def __init__(self, roots, content_type=None, cache_size=32 * 1024 * 1024, max_file_size=1024 * 1024,
+                 check_interval=2, watch=True, cache_control=None):
+        """
+        :param roots: List of root directories, in priority order.
+        :param content_type: Function that returns the content type for a file name.
+        :param cache_size: Maximum number of bytes kept in memory.
+        :param max_file_size: Files larger than this are never kept in memory.
+        :param check_interval: Seconds between modification time checks of a file. None to never check.
+        :param watch: Invalidate files on inotify events if pyinotify is installed. Modification time checks
+            are then turned off.
+        :param cache_control: List of tuples (path prefix, Cache-Control value). The first matching prefix is used.
+        """
+        self.manifest = StaticManifest(roots, content_type=content_type)
+        self.cache_control_rules = cache_control or []
+        self.cache = LRUCache(max_size=cache_size)
+        self.max_file_size = max_file_size
+        self.check_interval = check_interval
+        self.notifier = None
+        if watch and pyinotify is not None:
+            self.start_watch()
+
+    def start_watch(self):
+        """
+        Starts a thread that invalidates files on inotify events.
+        """
+        watch_manager = pyinotify.WatchManager()
+        mask = pyinotify.IN_CLOSE_WRITE | pyinotify.IN_ATTRIB | pyinotify.IN_DELETE | pyinotify.IN_MOVED_FROM | \
+            pyinotify.IN_MOVED_TO | pyinotify.IN_CREATE
+        self.notifier = pyinotify.ThreadedNotifier(watch_manager, lambda event: self.invalidate(event.pathname))
+        self.notifier.daemon = True
+        for folder in self.manifest.watch_folders():
+            watch_manager.add_watch(folder, mask, rec=True, auto_add=True)
+        self.notifier.start()
+        self.check_interval = None
+
+    def stop_watch(self):
+        if self.notifier is not None:
+            self.notifier.stop()
+            self.notifier = None
+
+    def lookup(self, name):
+        """
+        Finds a static file and verifies that the manifest entry is up to date.
+        :param name: Requested name, for example static/angular.js.
+        :return: A StaticEntry or None if the file does not exist.
+        """
+        entry = self.manifest.lookup(name)
+        if entry is None:
+            return None
+        if self.check_interval is not None and time.time() - entry.checked > self.check_interval:
+            if self.manifest.refresh(entry):
+                for path in entry.paths():
+                    self.cache.pop(path)
+                entry = self.manifest.entries.get(entry.name)
+        return entry
+
+    def cache_control(self, name):
+        """
+        :param name: Requested name, for example static/angular.js.
+        :return: The Cache-Control value for the file or None.
+        """
+        for prefix, value in self.cache_control_rules:
+            if name.startswith(prefix):
+                return value
+        return None
+
+    def open(self, path):
+        """
+        Opens a static file or one of its variants. Small files are read into memory and cached, large files are
+        returned as an open file.
+        :param path: StaticEntry.path or a path from StaticEntry.variants.
+        :return: A tuple (data, file, size). Either data or file is None.
+        """
+        data = self.cache.get(path)
+        if data is not None:
+            return data, None, len(data)
+        _file = open(path, "rb")
+        size = os.fstat(_file.fileno()).st_size
+        if size > self.max_file_size:
+            return None, _file, size
+        try:
+            data = _file.read()
+        finally:
+            _file.close()
+        self.cache.set(path, data)
+        return data, None, len(data)
+
+    def iterate(self, environ, data, _file, size, first, last):
+        """
+        Creates a WSGI response body for a byte range of a file returned by open.
+        :param environ: The WSGI environment.
+        :param data: File content or None.
+        :param _file: Open file or None.
+        :param size: File size.
+        :param first: First byte to send.
+        :param last: Last byte to send.
+        :return: A WSGI iterable.
+        """
+        if data is not None:
+            if first == 0 and last == size - 1:
+                return [data]
+            return [data[first:last + 1]]
+        _file.seek(first)
+        if last == size - 1 and "wsgi.file_wrapper" in environ:
+            return environ["wsgi.file_wrapper"](_file, BLOCK_SIZE)
+        return FileIterator(_file, last - first + 1)
+
+    def read(self, path):
+        """
+        Returns the content of a static file or one of its variants, from memory if possible.
+        :param path: StaticEntry.path or a path from StaticEntry.variants.
+        :return: The file content.
+        """
+        data = self.cache.get(path)
+        if data is None:
+            with open(path, "rb") as _file:
+                data = _file.read()
+            if len(data) <= self.max_file_size:
+                self.cache.set(path, data)
+        return data
+
+    def preload(self):
+        """
+        Reads the small static files and their variants into memory, for example before worker processes are
+        forked so the processes share the cached files.
+        :return: Number of files read.
+        """
+        count = 0
+        for entry in self.manifest.entries.values():
+            for path in entry.paths():
+                try:
+                    if os.path.getsize(path) <= self.max_file_size:
+                        self.read(path)
+                        count += 1
+                except (IOError, OSError):
+                    logger.warning("Could not read static file %s.", path)
+        return count
+
+    def invalidate(self, path):
+        """
+        Drops a changed file from the cache and updates its manifest entries.
+        :param path: Path to the changed file.
+        """
+        path = os.path.realpath(path)
+        for encoding, suffix in ENCODINGS:
+            if path.endswith(suffix):
+                path = path[:-len(suffix)]
+        for entry in self.manifest.entries.values():
+            if entry.path == path:
+                for _path in entry.paths():
+                    self.cache.pop(_path)
+                self.manifest.refresh(entry)
+        self.cache.pop(path)
+
+
+class FileIterator(object):
+    """
+    Iterates over a part of an open file in fixed size blocks and closes the file when done.
+    """
+
+    def __init__(self, _file, length, block_size=BLOCK_SIZE):
+        self.file = _file
+        self.length = length
+        self.block_size = block_size
+
+    def __iter__(self):
+        remaining = self.length
+        while remaining > 0:
+            data = self.file.read(min(self.block_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data
+
+    def close(self):
+        self.file.close()
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Compares an If-None-Match header with an ETag, using the weak comparison.
+    :param if_none_match: The header value.
+    :param etag: The ETag of the response.
+    :return: True if the header matches the ETag.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    if etag.startswith("W/"):
+        etag = etag[2:]
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def parse_range(header, size):
+    """
+    Parses a Range header. Only a single byte range is supported, other headers are ignored.
+    :param header: The Range header, for example "bytes=0-1023".
+    :param size: Size of the file.
+    :return: A tuple (first, last) with the positions of the first and the last byte, None if the header should
+        be ignored or False if the range can not be satisfied.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+    spec = header[6:].strip()
+    if "," in spec:
+        return None
+    first, sep, last = spec.partition("-")
+    if not sep:
+        return None
+    try:
+        if not first:
+            length = int(last)
+            if length <= 0 or size == 0:
+                return False
+            return max(size - length, 0), size - 1
+        first = int(first)
+        last = int(last) if last else None
+    except ValueError:
+        return None
+    if first < 0 or (last is not None and first > last):
+        return None
+    if first >= size:
+        return False
+    if last is None:
+        return first, size - 1
+    return first, min(last, size - 1)
+
+
+def negotiate_encoding(accept_encoding, available):
+    """
+    Selects a content encoding according to an Accept-Encoding header.
+    :param accept_encoding: The Accept-Encoding header, for example "gzip, deflate;q=0.5".
+    :param available: The content encodings that can be delivered.
+    :return: The selected encoding or None if the uncompressed content should be used.
+    """
+    qvalues = {}
+    for item in accept_encoding.split(","):
+        parts = item.split(";")
+        coding = parts[0].strip().lower()
+        qvalue = 1.0
+        for param in parts[1:]:
+            param = param.strip()
+            if param.startswith("q="):
+                try:
+                    qvalue = float(param[2:])
+                except ValueError:
+                    qvalue = 0.0
+        if coding:
+            qvalues[coding] = qvalue
+    best = None
+    best_qvalue = 0.0
+    for encoding, suffix in ENCODINGS:
+        if encoding in available:
+            qvalue = qvalues.get(encoding, qvalues.get("*", 0.0))
+            if qvalue > best_qvalue:
+                best = encoding
+                best_qvalue = qvalue
+    return best
+
+
+def precompress(folder, extensions=COMPRESS_EXTENSIONS, min_size=256, level=9):
+    """
+    Writes .gz siblings, and .br siblings if brotli is installed, for all compressible files in a folder. Variants
+    that are up to date are not rewritten and variants that would not be smaller than the file are not written.
+    :param folder: The static folder.
+    :param extensions: File endings to compress.
+    :param min_size: Files smaller than this are not compressed.
+    :param level: Compression level for gzip.
+    :return: List with the paths of the written files.
+    """
+    written = []
+    for dirpath, dirnames, filenames in os.walk(folder):
+        for filename in filenames:
+            if not filename.endswith(extensions):
+                continue
+            path = os.path.join(dirpath, filename)
+            st = os.stat(path)
+            if st.st_size < min_size:
+                continue
+            data = None
+            for encoding, suffix in ENCODINGS:
+                if encoding == "br" and brotli is None:
+                    continue
+                try:
+                    if os.stat(path + suffix).st_mtime >= st.st_mtime:
+                        continue
+                except OSError:
+                    pass
+                if data is None:
+                    with open(path, "rb") as _file:
+                        data = _file.read()
+                if encoding == "br":
+                    compressed = brotli.compress(data)
+                else:
+                    compressed = gzip_compress(data, level, st.st_mtime)
+                if len(compressed) >= len(data):
+                    continue
+                tmp_path = path + suffix + ".tmp"
+                with open(tmp_path, "wb") as _file:
+                    _file.write(compressed)
+                os.rename(tmp_path, path + suffix)
+                written.append(path + suffix)
+    return written
+
+
+def gzip_compress(data, level=9, mtime=0):
+    buf = StringIO()
+    gzip_file = gzip.GzipFile(filename="", mode="wb", compresslevel=level, fileobj=buf, mtime=mtime)
+    gzip_file.write(data)
+    gzip_file.close()
+    return buf.getvalue()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright (C) Umeå University
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#            http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+A registry of compiled Mako templates.
+"""
+import logging
+import os
+
+from mako.lookup import TemplateLookup
+
+logger = logging.getLogger("dirg_util.template")
+
+TEMPLATE_EXTENSIONS = (".mako",)
+
+
+class TemplateRegistry(object):
+    def __init__(self, directories, module_directory=None, development=False, **kwargs):
+        """
+        :param directories: List of template directories.
+        :param module_directory: Directory for the compiled template modules, shared between processes. None to
+            only keep the compiled templates in memory.
+        :param development: Reload templates when the files are modified.
+        :param kwargs: Other arguments for the Mako TemplateLookup, for example input_encoding.
+        """
+        self.development = development
+        self.lookup = TemplateLookup(directories=directories, module_directory=module_directory,
+                                     filesystem_checks=development, **kwargs)
+        self.templates = {}
+
+    def precompile(self, extensions=TEMPLATE_EXTENSIONS):
+        """
+        Compiles all templates in the template directories.
+        :param extensions: File endings of the templates.
+        :return: Number of compiled templates.
+        """
+        count = 0
+        for directory in self.lookup.directories:
+            for dirpath, dirnames, filenames in os.walk(directory):
+                for filename in filenames:
+                    if filename.endswith(extensions):
+                        uri = os.path.relpath(os.path.join(dirpath, filename), directory).replace(os.sep, "/")
+                        self.get_template(uri)
+                        count += 1
+        logger.info("Compiled %d templates.", count)
+        return count
+
+    def get_template(self, uri):
+        """
+        :param uri: Template name.
+        :return: The compiled Mako template.
+        """
+        if self.development:
+            return self.lookup.get_template(uri)
+        try:
+            return self.templates[uri]
+        except KeyError:
+            template = self.lookup.get_template(uri)
+            self.templates[uri] = template
+            return template
+
+    def clear(self):
+        """
+        Drops the compiled templates, so they are loaded again. A template is only compiled again if its file has
+        changed since the module in module_directory was written.
+        """
+        self.templates = {}
+        self.lookup._collection.clear()
+
+    def has_template(self, uri):
+        return uri in self.templates or self.lookup.has_template(uri)
+
+    def adjust_uri(self, uri, relativeto):
+        return self.lookup.adjust_uri(uri, relativeto)
@@ -0,0 +1,95 @@
+import gzip
+import unittest
+from StringIO import StringIO
+from dirg_util.http_util import CompressionMiddleware
+
+BODY = "<html>" + "compress me " * 500 + "</html>"
+
+
+def application(body, headers=None, status="200 OK", content_type="text/html", chunks=1):
+    def app(environ, start_response):
+        _headers = [("Content-Type", content_type)]
+        _headers.extend(headers or [])
+        start_response(status, _headers)
+        size = len(body) // chunks + 1
+        return iter([body[i:i + size] for i in range(0, len(body), size)])
+    return app
+
+
+def gunzip(data):
+    return gzip.GzipFile(fileobj=StringIO(data)).read()
+
+
+class CompressionMiddlewareTest(unittest.TestCase):
+
+    def call(self, app, accept_encoding="gzip", method="GET", **kwargs):
+        environ = {"REQUEST_METHOD": method, "HTTP_ACCEPT_ENCODING": accept_encoding}
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = status
+            response["headers"] = headers
+            return None
+
+        body = "".join(CompressionMiddleware(app, **kwargs)(environ, start_response))
+        return response["status"], dict((name.lower(), value) for name, value in response["headers"]), body
+
+    def testCompressKnownLength(self):
+        status, headers, body = self.call(application(BODY, [("Content-Length", str(len(BODY)))]))
+        self.assertEqual(headers["content-encoding"], "gzip")
+        self.assertNotIn("content-length", headers)
+        self.assertEqual(headers["vary"], "Accept-Encoding")
+        self.assertEqual(gunzip(body), BODY)
+
+    def testCompressBufferedUnknownLength(self):
+        status, headers, body = self.call(application(BODY, chunks=50), min_size=1024)
+        self.assertEqual(headers["content-encoding"], "gzip")
+        self.assertEqual(gunzip(body), BODY)
+
+    def testSmallBufferedBodyIsIdentity(self):
+        status, headers, body = self.call(application("small", chunks=3), min_size=1024)
+        self.assertNotIn("content-encoding", headers)
+        self.assertEqual(headers["content-length"], "5")
+        self.assertEqual(headers["vary"], "Accept-Encoding")
+        self.assertEqual(body, "small")
+
+    def testSmallKnownLengthIsIdentity(self):
+        status, headers, body = self.call(application("small", [("Content-Length", "5")]))
+        self.assertNotIn("content-encoding", headers)
+        self.assertEqual(body, "small")
+
+    def testClientWithoutGzip(self):
+        for accept_encoding in ("", "identity", "gzip;q=0", "br"):
+            status, headers, body = self.call(application(BODY), accept_encoding)
+            self.assertNotIn("content-encoding", headers)
+            self.assertEqual(headers["vary"], "Accept-Encoding")
+            self.assertEqual(body, BODY)
+
+    def testIneligibleResponses(self):
+        for app in (application(BODY, content_type="image/png"),
+                    application(BODY, [("Content-Encoding", "br")]),
+                    application(BODY, [("Cache-Control", "no-transform")]),
+                    application(BODY, status="206 Partial Content")):
+            status, headers, body = self.call(app)
+            self.assertNotEqual(headers.get("content-encoding"), "gzip")
+            self.assertEqual(body, BODY)
+
+    def testHeadRequest(self):
+        status, headers, body = self.call(application(BODY, [("Content-Length", str(len(BODY)))]), method="HEAD")
+        self.assertNotIn("content-encoding", headers)
+        self.assertEqual(headers["vary"], "Accept-Encoding")
+
+    def testVaryIsExtended(self):
+        status, headers, body = self.call(application(BODY, [("Vary", "Cookie")]))
+        self.assertEqual(headers["vary"], "Cookie, Accept-Encoding")
+        status, headers, body = self.call(application(BODY, [("Vary", "accept-encoding")]))
+        self.assertEqual(headers["vary"], "accept-encoding")
+
+    def testEmptyBody(self):
+        status, headers, body = self.call(application(""))
+        self.assertEqual(status, "200 OK")
+        self.assertEqual(body, "")
+
+
+if __name__ == '__main__':
+    unittest.main()
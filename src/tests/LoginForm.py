@@ -0,0 +1,102 @@
+import os
+import shutil
+import tempfile
+import unittest
+from mako.lookup import TemplateLookup
+
+try:
+    from auth.form import DirgUsernamePasswordYubikeyMako
+except ImportError:
+    DirgUsernamePasswordYubikeyMako = None
+
+ESCAPED = '<form action="${action}"><input name="login" value="${login | h}"/>' \
+          '<input name="query" value="${query | h}"/>\n% if login:\nwelcome back\n% endif\n</form>'
+UNESCAPED = '<form action="${action}"><input name="login" value="${login}"/>' \
+            '<input name="query" value="${query | h}"/></form>'
+VALUES = ['<script>alert("x")</script>', "a&b", "it's", "50% + 1", u"\xe5\xe4\xf6", "plain"]
+
+
+class _CountingLookup(object):
+    def __init__(self, lookup):
+        self.lookup = lookup
+        self.renders = 0
+
+    def get_template(self, name):
+        template = self.lookup.get_template(name)
+        lookup = self
+
+        class _Template(object):
+            def render(self, **kwargs):
+                lookup.renders += 1
+                return template.render(**kwargs)
+
+        return _Template()
+
+
+@unittest.skipIf(DirgUsernamePasswordYubikeyMako is None, "pyYubitool is not installed")
+class LoginFormCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        for name, content in (("escaped.mako", ESCAPED), ("unescaped.mako", UNESCAPED)):
+            with open(os.path.join(self.folder, name), "w") as _file:
+                _file.write(content)
+        self.lookup = TemplateLookup(directories=[self.folder], input_encoding="utf-8")
+        self.counting_lookup = _CountingLookup(self.lookup)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def authn(self, template):
+        return DirgUsernamePasswordYubikeyMako("login", template, self.counting_lookup)
+
+    def expected(self, template, argv):
+        return self.lookup.get_template(template).render(**argv)
+
+    def testCachedForm(self):
+        authn = self.authn("escaped.mako")
+        for value in VALUES:
+            argv = {"action": "verify", "login": value, "query": "acr=" + value}
+            self.assertEqual(authn.render_form(argv), self.expected("escaped.mako", argv))
+        self.assertEqual(self.counting_lookup.renders, 1)
+
+    def testEscaping(self):
+        authn = self.authn("escaped.mako")
+        argv = {"action": "verify", "login": "<b>\"x\"</b> & 'y'", "query": "a=1&b=<2>"}
+        authn.render_form(dict(argv, login="first"))
+        form = authn.render_form(argv)
+        self.assertIn('value="&lt;b&gt;&#34;x&#34;&lt;/b&gt; &amp; &#39;y&#39;"', form)
+        self.assertIn('value="a=1&amp;b=&lt;2&gt;"', form)
+        self.assertNotIn("<b>", form)
+
+    def testEmptyValues(self):
+        authn = self.authn("escaped.mako")
+        for login in ("", "user", "", "other"):
+            argv = {"action": "verify", "login": login, "query": ""}
+            self.assertEqual(authn.render_form(argv), self.expected("escaped.mako", argv))
+        self.assertEqual(self.counting_lookup.renders, 2)
+
+    def testOtherArgumentsAreKeys(self):
+        authn = self.authn("escaped.mako")
+        for action in ("verify", "other", "verify"):
+            argv = {"action": action, "login": "user", "query": "q"}
+            self.assertEqual(authn.render_form(argv), self.expected("escaped.mako", argv))
+        self.assertEqual(self.counting_lookup.renders, 2)
+
+    def testTemplateWithoutEscaping(self):
+        authn = self.authn("unescaped.mako")
+        for value in VALUES:
+            argv = {"action": "verify", "login": value, "query": value}
+            self.assertEqual(authn.render_form(argv), self.expected("unescaped.mako", argv))
+        self.assertEqual(self.counting_lookup.renders, len(VALUES) + 1)
+
+    def testCacheDisabled(self):
+        authn = DirgUsernamePasswordYubikeyMako("login", "escaped.mako", self.counting_lookup, form_cache_size=0)
+        for value in VALUES:
+            argv = {"action": "verify", "login": value, "query": value}
+            self.assertEqual(authn.render_form(argv), self.expected("escaped.mako", argv))
+        self.assertEqual(self.counting_lookup.renders, len(VALUES))
+
+
+if __name__ == '__main__':
+    unittest.main()
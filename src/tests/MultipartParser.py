@@ -0,0 +1,134 @@
+import cgi
+import logging
+import unittest
+from StringIO import StringIO
+from dirg_util.http_util import HttpHandler, MultipartParser, MultipartError, RequestTooLarge, parse_multipart
+
+BOUNDARY = "----dirgboundary1234"
+
+
+def multipart_body(fields, files=(), boundary=BOUNDARY):
+    lines = []
+    for name, value in fields:
+        lines.extend(["--" + boundary, 'Content-Disposition: form-data; name="%s"' % name, "", value])
+    for name, filename, content in files:
+        lines.extend(["--" + boundary,
+                      'Content-Disposition: form-data; name="%s"; filename="%s"' % (name, filename),
+                      "Content-Type: application/octet-stream", "", content])
+    lines.extend(["--" + boundary + "--", ""])
+    return "\r\n".join(lines)
+
+
+def multipart_environ(body, boundary=BOUNDARY):
+    return {"REQUEST_METHOD": "POST", "PATH_INFO": "/upload",
+            "CONTENT_TYPE": "multipart/form-data; boundary=%s" % boundary,
+            "CONTENT_LENGTH": str(len(body)), "wsgi.input": StringIO(body)}
+
+
+class MultipartParserTest(unittest.TestCase):
+
+    def parse(self, body, **kwargs):
+        return [(part.name, part.filename, part.value)
+                for part in MultipartParser(StringIO(body), BOUNDARY, len(body), **kwargs)]
+
+    def testFieldsAndFiles(self):
+        content = "".join(chr(i % 256) for i in range(3000))
+        body = multipart_body([("user", "test"), ("empty", ""), ("user", "other")], [("upload", "a.bin", content)])
+        self.assertEqual(self.parse(body), [("user", None, "test"), ("empty", None, ""), ("user", None, "other"),
+                                            ("upload", "a.bin", content)])
+
+    def testBoundarySplitAcrossReads(self):
+        # Content that almost contains the delimiter, split at every possible position.
+        tricky = "\r\n--" + BOUNDARY[:-1] + "x\r\n-" + "\r\n--" + BOUNDARY[:10]
+        body = multipart_body([("a", "1"), ("b", tricky)], [("f", "f.txt", tricky * 3)])
+        expected = self.parse(body)
+        self.assertEqual(expected, [("a", None, "1"), ("b", None, tricky), ("f", "f.txt", tricky * 3)])
+        for block_size in range(1, len(BOUNDARY) + 8):
+            self.assertEqual(self.parse(body, block_size=block_size), expected)
+
+    def testPreambleAndEpilogue(self):
+        body = "preamble\r\n" + multipart_body([("a", "1")]) + "epilogue"
+        self.assertEqual(self.parse(body, block_size=7), [("a", None, "1")])
+
+    def testTruncatedBody(self):
+        body = multipart_body([("a", "1"), ("b", "2" * 100)])
+        for length in (10, len(body) // 2, len(body) - 10):
+            truncated = body[:length]
+            self.assertRaises(MultipartError, self.parse, truncated)
+            self.assertRaises(MultipartError, self.parse, truncated, block_size=3)
+
+    def testStreamShorterThanContentLength(self):
+        body = multipart_body([("a", "1" * 100)])
+        parser = MultipartParser(StringIO(body[:50]), BOUNDARY, len(body))
+        self.assertRaises(MultipartError, list, parser)
+
+    def testInvalidBoundary(self):
+        self.assertRaises(MultipartError, MultipartParser, StringIO(""), "", 0)
+        self.assertRaises(MultipartError, MultipartParser, StringIO(""), "x" * 201, 0)
+
+    def testMaxSize(self):
+        body = multipart_body([("a", "1" * 100)])
+        self.assertRaises(RequestTooLarge, MultipartParser, StringIO(body), BOUNDARY, len(body),
+                          max_size=len(body) - 1)
+        self.assertEqual(len(self.parse(body, max_size=len(body))), 1)
+
+    def testMaxParts(self):
+        body = multipart_body([("f%d" % i, "1") for i in range(5)])
+        self.assertEqual(len(self.parse(body, max_parts=5)), 5)
+        self.assertRaises(RequestTooLarge, self.parse, body, max_parts=4)
+
+    def testMaxPartSize(self):
+        body = multipart_body([("a", "1" * 100)])
+        self.assertEqual(len(self.parse(body, max_part_size=100)), 1)
+        self.assertRaises(RequestTooLarge, self.parse, body, max_part_size=99)
+        self.assertRaises(RequestTooLarge, self.parse, body, max_part_size=99, block_size=5)
+
+    def testMaxHeaderSize(self):
+        body = multipart_body([("a" * 10000, "1")])
+        self.assertRaises(MultipartError, self.parse, body)
+
+    def testSpooledPart(self):
+        content = "x" * 5000
+        parts = list(MultipartParser(StringIO(multipart_body([], [("f", "f.txt", content)])), BOUNDARY,
+                                     len(multipart_body([], [("f", "f.txt", content)])), spool_size=1000))
+        self.assertEqual(parts[0].size, 5000)
+        self.assertEqual(parts[0].file.read(), content)
+
+
+class MultipartRequestTest(unittest.TestCase):
+
+    def testParseMultipart(self):
+        body = multipart_body([("a", "1"), ("a", "2"), ("b", "3")], [("f", "f.txt", "data")])
+        query = parse_multipart(multipart_environ(body))
+        self.assertEqual(query["a"], ["1", "2"])
+        self.assertEqual(query["b"], "3")
+        self.assertEqual(query["f"].value, "data")
+
+    def testBodyIsKeptAfterParsing(self):
+        body = multipart_body([("a", "1")], [("f", "f.txt", "data")])
+        environ = multipart_environ(body)
+        self.assertEqual(HttpHandler.query_dictionary(environ)["a"], "1")
+        self.assertEqual(environ["wsgi.input"].read(), body)
+        environ["wsgi.input"].seek(0)
+        form = cgi.FieldStorage(fp=environ["wsgi.input"], environ=environ)
+        self.assertEqual(form.getfirst("a"), "1")
+
+    def testLogTruncatedBody(self):
+        body = multipart_body([("a", "1" * 100)])[:50]
+        environ = multipart_environ(body)
+        environ["CONTENT_LENGTH"] = "200"
+        logger = logging.getLogger("dirg_util.tests.multipart")
+        logger.setLevel(logging.INFO)
+        logger.addHandler(_NullHandler())
+        handler = HttpHandler(environ, None, None, logger)
+        handler.log_request("400 Bad Request")
+        self.assertRaises(MultipartError, handler.query_dict)
+
+
+class _NullHandler(logging.Handler):
+    def emit(self, record):
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
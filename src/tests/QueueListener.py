@@ -0,0 +1,192 @@
+import logging
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import unittest
+from StringIO import StringIO
+from dirg_util import log
+from dirg_util.log import QueueHandler, QueueListener
+
+
+class _RecordingHandler(logging.Handler):
+    """
+    Keeps the messages and the number of records between every flush. The first record waits for the resume event.
+    """
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+        self.batches = [0]
+        self.waiting = threading.Event()
+        self.resume = threading.Event()
+
+    def emit(self, record):
+        if not self.messages:
+            self.waiting.set()
+            self.resume.wait(10)
+        self.messages.append(record.getMessage())
+        self.batches[-1] += 1
+
+    def flush_batch(self):
+        self.batches.append(0)
+
+
+def record(msg, level=logging.INFO):
+    return logging.makeLogRecord({"name": "test", "levelno": level, "levelname": logging.getLevelName(level),
+                                  "msg": msg})
+
+
+class QueueListenerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = _RecordingHandler()
+
+    def start(self, queue_size=1000, batch_size=100):
+        listener = QueueListener([self.handler], queue_size, batch_size)
+        listener.start()
+        self.addCleanup(listener.stop)
+        self.addCleanup(self.handler.resume.set)
+        return listener, QueueHandler(listener, block_timeout=0.01)
+
+    def testOneFlushPerBatch(self):
+        listener, queue_handler = self.start()
+        queue_handler.handle(record("first"))
+        self.handler.waiting.wait(10)
+        for i in range(249):
+            queue_handler.handle(record("record %d" % i))
+        self.handler.resume.set()
+        listener.stop()
+        self.assertEqual([size for size in self.handler.batches if size], [1, 100, 100, 49])
+        self.assertEqual(len(self.handler.messages), 250)
+
+    def testDroppedRecordsAreCounted(self):
+        listener, queue_handler = self.start(queue_size=5)
+        queue_handler.handle(record("first"))
+        self.handler.waiting.wait(10)
+        for i in range(8):
+            queue_handler.handle(record("info %d" % i))
+        queue_handler.handle(record("warning", logging.WARNING))
+        self.assertEqual(listener.dropped, 4)
+        self.handler.resume.set()
+        listener.stop()
+        # The records were dropped while the first batch was written, the report follows that batch.
+        self.assertEqual(self.handler.messages[1], "4 log records dropped, the log queue was full.")
+        self.assertEqual(self.handler.messages[2:], ["info %d" % i for i in range(5)])
+
+    def testStopWritesWaitingRecords(self):
+        listener, queue_handler = self.start()
+        self.handler.resume.set()
+        for i in range(10):
+            queue_handler.handle(record("record %d" % i))
+        listener.stop()
+        self.assertEqual(len(self.handler.messages), 10)
+
+
+class ForkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.filename = os.path.join(self.folder, "server.log")
+        self.logger = log.create_logger(self.filename, level=logging.INFO)
+        self.listener = log._listeners[-1]
+        self.file_handler = self.listener.handlers[0]
+
+    def tearDown(self):
+        self.listener.stop()
+        log._listeners.remove(self.listener)
+        for handler in self.logger.handlers[:]:
+            if isinstance(handler, QueueHandler) and handler.listener is self.listener:
+                self.logger.removeHandler(handler)
+        self.file_handler.close()
+        shutil.rmtree(self.folder)
+
+    def fork(self, func):
+        log.before_fork()
+        try:
+            self.assertIsNone(self.listener.thread)
+            pid = os.fork()
+            if not pid:
+                status = 1
+                try:
+                    log.after_fork_child()
+                    func()
+                    logging.shutdown()
+                    status = 0
+                finally:
+                    os._exit(status)
+        finally:
+            log.after_fork_parent()
+        return os.waitpid(pid, 0)[1]
+
+    def testChildLogs(self):
+        self.logger.info("parent before")
+
+        def child():
+            self.logger.info("child %d", os.getpid())
+
+        self.assertEqual(self.fork(child), 0)
+        self.logger.info("parent after")
+        self.listener.stop()
+        with open(self.filename) as _file:
+            content = _file.read()
+        self.assertIn("parent before", content)
+        self.assertIn("child ", content)
+        self.assertIn("parent after", content)
+
+    def testHandlerLockHeldByOtherThread(self):
+        # A lock held by another thread at the fork would stay locked in the child for ever.
+        stream = StringIO()
+        other_handler = logging.StreamHandler(stream)
+        other_logger = logging.getLogger("dirg_util.tests.fork")
+        other_logger.addHandler(other_handler)
+        self.addCleanup(other_logger.removeHandler, other_handler)
+        held = threading.Event()
+        done = threading.Event()
+
+        def hold():
+            other_handler.acquire()
+            held.set()
+            done.wait(10)
+            other_handler.release()
+
+        def child():
+            signal.alarm(5)
+            other_logger.warning("child with new locks")
+            if "child with new locks" not in stream.getvalue():
+                raise AssertionError("Not logged.")
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        held.wait(10)
+        try:
+            status = self.fork(child)
+        finally:
+            done.set()
+            thread.join()
+        self.assertEqual(status, 0)
+        self.listener.stop()
+        with open(self.filename) as _file:
+            self.assertIn("child with new locks", _file.read())
+
+    def testLoggingWaitsDuringFork(self):
+        log.before_fork()
+        logged = threading.Event()
+
+        def log_record():
+            self.logger.warning("logged during the fork")
+            logged.set()
+
+        thread = threading.Thread(target=log_record)
+        try:
+            thread.start()
+            self.assertFalse(logged.wait(0.2))
+        finally:
+            log.after_fork_parent()
+        thread.join(10)
+        self.assertTrue(logged.is_set())
+
+
+if __name__ == '__main__':
+    unittest.main()
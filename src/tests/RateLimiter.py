@@ -0,0 +1,133 @@
+import unittest
+from dirg_util import ratelimit
+from dirg_util.ratelimit import RateLimited, RateLimiter, TokenBucketLimiter, client_address
+
+
+class _Clock(object):
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        return self.now
+
+
+class ClockTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.time = ratelimit.time
+        ratelimit.time = self.clock
+
+    def tearDown(self):
+        ratelimit.time = self.time
+
+
+class TokenBucketLimiterTest(ClockTestCase):
+
+    def testBurstAndRefill(self):
+        limiter = TokenBucketLimiter(rate=1, burst=3)
+        self.assertEqual([limiter.allow("a") for _ in range(4)], [True, True, True, False])
+        self.clock.now += 1
+        self.assertEqual([limiter.allow("a") for _ in range(2)], [True, False])
+        self.clock.now += 100
+        self.assertEqual([limiter.allow("a") for _ in range(4)], [True, True, True, False])
+
+    def testKeysAreIndependent(self):
+        limiter = TokenBucketLimiter(rate=1, burst=1)
+        self.assertTrue(limiter.allow("a"))
+        self.assertFalse(limiter.allow("a"))
+        self.assertTrue(limiter.allow("b"))
+
+    def testCheckDoesNotTakeTokens(self):
+        limiter = TokenBucketLimiter(rate=1, burst=1)
+        for _ in range(3):
+            self.assertTrue(limiter.check("a"))
+        self.assertEqual(len(limiter), 0)
+        self.assertTrue(limiter.allow("a"))
+        self.assertFalse(limiter.check("a"))
+
+    def testLeastRecentlyUsedIsDropped(self):
+        limiter = TokenBucketLimiter(rate=0, burst=1, shards=1, max_keys=2)
+        self.assertTrue(limiter.allow("a"))
+        self.assertTrue(limiter.allow("b"))
+        self.assertFalse(limiter.allow("a"))
+        self.assertTrue(limiter.allow("c"))
+        self.assertEqual(len(limiter), 2)
+        # b was dropped and starts with a full bucket, a was used more recently and is still empty.
+        self.assertTrue(limiter.allow("b"))
+        self.assertFalse(limiter.allow("c"))
+
+    def testReset(self):
+        limiter = TokenBucketLimiter(rate=0, burst=1)
+        limiter.allow("a")
+        limiter.reset("a")
+        self.assertTrue(limiter.allow("a"))
+
+
+class ClientAddressTest(unittest.TestCase):
+
+    def testWithoutProxy(self):
+        environ = {"REMOTE_ADDR": "10.0.0.1", "HTTP_X_FORWARDED_FOR": "1.2.3.4"}
+        self.assertEqual(client_address(environ), "10.0.0.1")
+
+    def testTrustedProxy(self):
+        environ = {"REMOTE_ADDR": "10.0.0.1", "HTTP_X_FORWARDED_FOR": "6.6.6.6, 1.2.3.4, 10.0.0.2"}
+        self.assertEqual(client_address(environ, ("10.0.0.1", "10.0.0.2")), "1.2.3.4")
+
+    def testUntrustedProxy(self):
+        environ = {"REMOTE_ADDR": "10.0.0.9", "HTTP_X_FORWARDED_FOR": "1.2.3.4"}
+        self.assertEqual(client_address(environ, ("10.0.0.1",)), "10.0.0.9")
+
+
+class RateLimiterTest(ClockTestCase):
+
+    def testAddressLimit(self):
+        limiter = RateLimiter(ip_rate=0, ip_burst=2)
+        self.assertEqual([limiter.allow("1.2.3.4", "user%d" % i) for i in range(3)], [True, True, False])
+        self.assertTrue(limiter.allow("1.2.3.5", "user"))
+
+    def testOnlyFailedAttemptsUseTheUserBudget(self):
+        limiter = RateLimiter(ip_rate=0, ip_burst=100, user_rate=0.1, user_burst=2)
+        for _ in range(10):
+            self.assertTrue(limiter.allow("1.2.3.4", "user"))
+        limiter.failed("user")
+        self.assertTrue(limiter.allow("1.2.3.5", "user"))
+        limiter.failed("user")
+        self.assertFalse(limiter.allow("1.2.3.6", "user"))
+        self.assertTrue(limiter.allow("1.2.3.6", "other"))
+        self.clock.now += 10
+        self.assertTrue(limiter.allow("1.2.3.6", "user"))
+
+
+try:
+    from auth.form import DirgUsernamePasswordYubikeyMako
+except ImportError:
+    DirgUsernamePasswordYubikeyMako = None
+
+
+@unittest.skipIf(DirgUsernamePasswordYubikeyMako is None, "pyYubitool is not installed")
+class VerifyRateLimitTest(ClockTestCase):
+
+    def setUp(self):
+        ClockTestCase.setUp(self)
+        self.authn = DirgUsernamePasswordYubikeyMako("login", None, None, {"user": "secret"}, "password",
+                                                     rate_limiter=RateLimiter(user_rate=0.1, user_burst=2))
+        self.environ = {"REMOTE_ADDR": "1.2.3.4"}
+
+    def verify(self, password):
+        return self.authn.verify({"login": "user", "password": password}, environ=self.environ)
+
+    def testSuccessDoesNotUseTheUserBudget(self):
+        for _ in range(5):
+            self.assertEqual(self.verify("secret")[:2], (True, "user"))
+
+    def testFailedAttempts(self):
+        self.assertEqual(self.verify("wrong"), (False, None, None))
+        self.assertEqual(self.verify("wrong"), (False, None, None))
+        self.assertRaises(RateLimited, self.verify, "secret")
+        self.clock.now += 10
+        self.assertEqual(self.verify("secret")[:2], (True, "user"))
+
+
+if __name__ == '__main__':
+    unittest.main()
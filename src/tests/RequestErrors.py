@@ -0,0 +1,133 @@
+import unittest
+from StringIO import StringIO
+from dirg_util.http_util import HttpHandler, Request, Response, RequestTooLarge, get_post, wsgi_wrapper
+from dirg_util.router import Router
+
+MANY_FIELDS = "&".join("f%d=1" % i for i in range(2000))
+
+
+def post_environ(body, content_type="application/x-www-form-urlencoded", content_length=None):
+    if content_length is None:
+        content_length = len(body)
+    return {"REQUEST_METHOD": "POST", "PATH_INFO": "/login", "CONTENT_TYPE": content_type,
+            "CONTENT_LENGTH": str(content_length), "wsgi.input": StringIO(body), "wsgi.url_scheme": "http",
+            "HTTP_HOST": "localhost"}
+
+
+def call(app, environ):
+    response = {}
+
+    def start_response(status, headers, exc_info=None):
+        response["status"] = status
+
+    body = "".join(app(environ, start_response))
+    return response["status"], body
+
+
+class DispatchRequestErrorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.router = Router()
+        self.router.add("login", self.login)
+        self.router.freeze()
+
+    @staticmethod
+    def login(handler, **kwargs):
+        resp = Response(str(len(handler.query_dict())))
+        return resp(handler.environ, handler.start_response)
+
+    def dispatch(self, environ, start_response):
+        return HttpHandler(environ, start_response, None, None).dispatch(self.router)
+
+    def testValidRequest(self):
+        self.assertEqual(call(self.dispatch, post_environ("a=1&b=2")), ("200 OK", "2"))
+
+    def testTooLarge(self):
+        status, body = call(self.dispatch, post_environ("a=1", content_length=HttpHandler.MAX_BODY_SIZE + 1))
+        self.assertTrue(status.startswith("413"))
+
+    def testTooManyFields(self):
+        status, body = call(self.dispatch, post_environ(MANY_FIELDS))
+        self.assertTrue(status.startswith("400"))
+
+    def testTruncatedMultipart(self):
+        body = "--xyz\r\nContent-Disposition: form-data; name=\"a\"\r\n\r\n1"
+        status, body = call(self.dispatch, post_environ(body, "multipart/form-data; boundary=xyz"))
+        self.assertTrue(status.startswith("400"))
+
+
+class WsgiWrapperRequestErrorTest(unittest.TestCase):
+
+    def app(self, environ, start_response):
+        return wsgi_wrapper(environ, start_response, self.handler)
+
+    def handler(self, request, **kwargs):
+        return Response(request)
+
+    def testValidRequest(self):
+        self.assertEqual(call(self.app, post_environ("a=1")), ("200 OK", "a=1"))
+
+    def testTooLarge(self):
+        status, body = call(self.app, post_environ("a=1", content_length=HttpHandler.MAX_BODY_SIZE + 1))
+        self.assertTrue(status.startswith("413"))
+
+    def testHandlerError(self):
+        def handler(**kwargs):
+            return Response(str(len(HttpHandler.query_dictionary(environ))))
+
+        environ = post_environ(MANY_FIELDS)
+        status, body = call(lambda environ, start_response: wsgi_wrapper(environ, start_response, handler), environ)
+        self.assertTrue(status.startswith("400"))
+
+
+class MaxBodySizeTest(unittest.TestCase):
+
+    def setUp(self):
+        self.max_body_size = HttpHandler.MAX_BODY_SIZE
+
+    def tearDown(self):
+        HttpHandler.MAX_BODY_SIZE = self.max_body_size
+
+    def testLimitIsReadWhenCalled(self):
+        HttpHandler.MAX_BODY_SIZE = 10
+        self.assertRaises(RequestTooLarge, get_post, post_environ("a=" + "x" * 9))
+        self.assertEqual(get_post(post_environ("a=" + "x" * 8)), "a=" + "x" * 8)
+        status, body = call(lambda environ, start_response: wsgi_wrapper(environ, start_response,
+                                                                          lambda **kwargs: Response("")),
+                            post_environ("a=" + "x" * 9))
+        self.assertTrue(status.startswith("413"))
+
+    def testNoLimit(self):
+        HttpHandler.MAX_BODY_SIZE = None
+        self.assertEqual(len(get_post(post_environ("a=" + "x" * 100))), 102)
+
+
+try:
+    from oic.utils.http_util import BadRequest, Unauthorized
+    from auth.pyoidc.user import UsernamePasswordMako
+except ImportError:
+    UsernamePasswordMako = None
+
+
+@unittest.skipIf(UsernamePasswordMako is None, "pyoidc is not installed")
+class PyoidcRequestErrorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.authn = UsernamePasswordMako("login", None, "login.mako", None, {"user": "secret"},
+                                          password_query_key="password")
+
+    def testTooManyFields(self):
+        self.assertIsInstance(self.authn.verify(MANY_FIELDS), BadRequest)
+
+    def testTooLarge(self):
+        request = Request.from_environ(post_environ("login=user", content_length=HttpHandler.MAX_BODY_SIZE + 1))
+        self.assertIsInstance(self.authn.verify(request), BadRequest)
+
+    def testWrongPassword(self):
+        resp = self.authn.verify("login=user&password=wrong")
+        self.assertIsInstance(resp, Unauthorized)
+        self.assertNotIsInstance(resp, BadRequest)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import logging
+import unittest
+from StringIO import StringIO
+from dirg_util.http_util import BODY_KEY, HttpHandler, Response, wsgi_wrapper
+from dirg_util.log import SamplingFilter
+from dirg_util.router import Router
+
+
+class _RecordingHandler(logging.Handler):
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def environ(method="GET", path="/page", query_string="", body=""):
+    return {"REQUEST_METHOD": method, "PATH_INFO": path, "QUERY_STRING": query_string,
+            "CONTENT_TYPE": "application/x-www-form-urlencoded", "CONTENT_LENGTH": str(len(body)),
+            "wsgi.input": StringIO(body), "wsgi.url_scheme": "http", "HTTP_HOST": "localhost"}
+
+
+def start_response(status, headers, exc_info=None):
+    pass
+
+
+class RequestLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = logging.getLogger("dirg_util.tests.request_log")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        self.handler = _RecordingHandler()
+        self.logger.addHandler(self.handler)
+        self.router = Router()
+        self.router.add("page", lambda handler, **kwargs: Response("page")(handler.environ, handler.start_response))
+        self.router.freeze()
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+
+    def dispatch(self, _environ):
+        return "".join(HttpHandler(_environ, start_response, None, self.logger).dispatch(self.router))
+
+    def testDispatchLogsOneLine(self):
+        self.assertEqual(self.dispatch(environ(query_string="b=1&a=2")), "page")
+        self.assertEqual(len(self.handler.records), 1)
+        record = self.handler.records[0]
+        self.assertEqual(record.status, "200 OK")
+        self.assertTrue(record.duration >= 0)
+        self.assertIn("query=['a', 'b']", record.getMessage())
+        self.assertIn("status=200 OK", record.getMessage())
+
+    def testDispatchLogsNotFound(self):
+        self.dispatch(environ(path="/unknown"))
+        self.assertTrue(self.handler.records[0].status.startswith("404"))
+
+    def testBodyIsNotParsed(self):
+        _environ = environ(method="POST", body="password=secret")
+        HttpHandler(_environ, start_response, None, self.logger).log_request("200 OK")
+        self.assertIn("query=[]", self.handler.records[0].getMessage())
+        self.assertNotIn(BODY_KEY, _environ)
+        self.assertEqual(_environ["wsgi.input"].read(), "password=secret")
+
+    def testParsedBodyIsListed(self):
+        _environ = environ(method="POST", body="password=secret")
+        HttpHandler.query_dictionary(_environ)
+        HttpHandler(_environ, start_response, None, self.logger).log_request()
+        self.assertIn("query=['password']", self.handler.records[0].getMessage())
+        self.assertNotIn("secret", self.handler.records[0].getMessage())
+
+    def testSampling(self):
+        self.handler.addFilter(SamplingFilter(rate=2, slow=None))
+        for _ in range(4):
+            self.dispatch(environ())
+        self.assertEqual(len(self.handler.records), 2)
+
+    def testQueryNamesAreFoundWhenFormatted(self):
+        self.dispatch(environ(query_string="&".join("f%d=1" % i for i in range(2000))))
+        record = self.handler.records[0]
+        self.assertNotIsInstance(record.args[3], basestring)
+        self.assertIn("query=More than 1000 fields.", record.getMessage())
+
+    def testDisabled(self):
+        self.logger.setLevel(logging.WARNING)
+        self.dispatch(environ())
+        self.assertEqual(self.handler.records, [])
+
+
+class WrapperLogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.logger = logging.getLogger("dirg_util.http_util")
+        self.level = self.logger.level
+        self.logger.setLevel(logging.INFO)
+        self.handler = _RecordingHandler()
+        self.logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.logger.removeHandler(self.handler)
+        self.logger.setLevel(self.level)
+
+    def testStatusAndDuration(self):
+        "".join(wsgi_wrapper(environ(), start_response, lambda **kwargs: Response("ok")))
+        record = [record for record in self.handler.records if hasattr(record, "duration")][0]
+        self.assertEqual(record.status, "200 OK")
+        self.assertTrue(record.duration >= 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
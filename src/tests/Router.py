@@ -0,0 +1,129 @@
+import unittest
+from StringIO import StringIO
+from dirg_util.http_util import HttpHandler
+from dirg_util.router import Router, RouteNotFound, RouteMethodNotAllowed
+
+
+def login(handler, **kwargs):
+    return "login"
+
+
+def show_user(handler, **kwargs):
+    return "show_user"
+
+
+def update_user(handler, **kwargs):
+    return "update_user"
+
+
+def download(handler, **kwargs):
+    return "download"
+
+
+def user_by_name(handler, **kwargs):
+    return "user_by_name"
+
+
+class RouterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.router = Router()
+        self.router.add("login", login)
+        self.router.add("user/me", user_by_name, methods=["GET"])
+        self.router.add("user/<uid:int>", show_user, methods=["GET"])
+        self.router.add("user/<uid:int>", update_user, methods=["POST"])
+        self.router.add("user/<name>", user_by_name, methods=["GET"])
+        self.router.add("files/<name:path>", download)
+        self.router.add("price/<value:float>", login)
+        self.router.freeze()
+
+    def testStaticRoute(self):
+        self.assertEqual(self.router.match("GET", "login"), (login, {}))
+        self.assertEqual(self.router.match("POST", "/login"), (login, {}))
+        self.assertIn("login", self.router.static_routes)
+
+    def testTypedParameters(self):
+        self.assertEqual(self.router.match("GET", "user/17"), (show_user, {"uid": 17}))
+        self.assertEqual(self.router.match("POST", "user/17"), (update_user, {"uid": 17}))
+        self.assertEqual(self.router.match("GET", "price/1.5"), (login, {"value": 1.5}))
+
+    def testStaticBeforeParameter(self):
+        self.assertEqual(self.router.match("GET", "user/me"), (user_by_name, {}))
+
+    def testFallbackToNextParameter(self):
+        self.assertEqual(self.router.match("GET", "user/anna"), (user_by_name, {"name": "anna"}))
+
+    def testPathParameter(self):
+        self.assertEqual(self.router.match("GET", "files/a/b/c.txt"), (download, {"name": "a/b/c.txt"}))
+        self.assertRaises(RouteNotFound, self.router.match, "GET", "files/")
+
+    def testHeadAnsweredByGet(self):
+        self.assertEqual(self.router.match("HEAD", "user/17"), (show_user, {"uid": 17}))
+
+    def testNotFound(self):
+        self.assertRaises(RouteNotFound, self.router.match, "GET", "unknown")
+        self.assertRaises(RouteNotFound, self.router.match, "GET", "user/17/more")
+        self.assertRaises(RouteNotFound, self.router.match, "GET", "user/")
+
+    def testMethodNotAllowed(self):
+        try:
+            self.router.match("DELETE", "user/17")
+            self.fail("DELETE should not be allowed")
+        except RouteMethodNotAllowed as error:
+            self.assertEqual(error.allowed, ["GET", "HEAD", "POST"])
+
+    def testInvalidRoutes(self):
+        router = Router()
+        self.assertRaises(ValueError, router.add, "a/<x:unknown>", login)
+        self.assertRaises(ValueError, router.add, "a/<x:path>/b", login)
+        router.add("a/<x:int>", login, methods=["GET"])
+        self.assertRaises(ValueError, router.add, "a/<y:int>", login)
+        self.assertRaises(ValueError, router.add, "a/<x:int>", login, methods=["GET"])
+        router.freeze()
+        self.assertRaises(RuntimeError, router.add, "b", login)
+
+    def testDecorator(self):
+        router = Router()
+
+        @router.route("hello/<name>", methods=["GET"])
+        def hello(handler, name):
+            return name
+
+        self.assertEqual(router.match("GET", "hello/world"), (hello, {"name": "world"}))
+
+
+class DispatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.router = Router()
+        self.router.add("user/<uid:int>", lambda handler, uid, **kwargs: ["user %d" % uid], methods=["GET"])
+        self.router.freeze()
+
+    def dispatch(self, method, path):
+        environ = {"REQUEST_METHOD": method, "PATH_INFO": path, "wsgi.input": StringIO(""),
+                   "wsgi.url_scheme": "http", "HTTP_HOST": "localhost"}
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = status
+            response["headers"] = dict(headers)
+
+        body = "".join(HttpHandler(environ, start_response, None, None).dispatch(self.router))
+        return response.get("status"), response.get("headers"), body
+
+    def testDispatch(self):
+        status, headers, body = self.dispatch("GET", "/user/3")
+        self.assertEqual(body, "user 3")
+
+    def testDispatchNotFound(self):
+        status, headers, body = self.dispatch("GET", "/user/x")
+        self.assertTrue(status.startswith("404"))
+
+    def testDispatchMethodNotAllowed(self):
+        status, headers, body = self.dispatch("POST", "/user/3")
+        self.assertTrue(status.startswith("405"))
+        self.assertEqual(headers["Allow"], "GET, HEAD")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,275 @@
+import os
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+from dirg_util.http_util import HttpHandler
+from dirg_util.static import StaticFiles, etag_matches, parse_range
+
+
+class ParseRangeTest(unittest.TestCase):
+
+    def testSingleRange(self):
+        self.assertEqual(parse_range("bytes=0-99", 1000), (0, 99))
+        self.assertEqual(parse_range("bytes=100-199", 1000), (100, 199))
+
+    def testLastBeyondSize(self):
+        self.assertEqual(parse_range("bytes=900-2000", 1000), (900, 999))
+
+    def testSuffixRange(self):
+        self.assertEqual(parse_range("bytes=-100", 1000), (900, 999))
+        self.assertEqual(parse_range("bytes=-2000", 1000), (0, 999))
+
+    def testOpenEndedRange(self):
+        self.assertEqual(parse_range("bytes=500-", 1000), (500, 999))
+        self.assertEqual(parse_range("bytes=0-", 1000), (0, 999))
+
+    def testMultiRangeIsIgnored(self):
+        self.assertEqual(parse_range("bytes=0-99,200-299", 1000), None)
+
+    def testUnsatisfiableRange(self):
+        self.assertEqual(parse_range("bytes=1000-", 1000), False)
+        self.assertEqual(parse_range("bytes=1000-1100", 1000), False)
+        self.assertEqual(parse_range("bytes=-0", 1000), False)
+        self.assertEqual(parse_range("bytes=-10", 0), False)
+
+    def testInvalidRangeIsIgnored(self):
+        self.assertEqual(parse_range("", 1000), None)
+        self.assertEqual(parse_range("items=0-99", 1000), None)
+        self.assertEqual(parse_range("bytes=abc-def", 1000), None)
+        self.assertEqual(parse_range("bytes=200-100", 1000), None)
+        self.assertEqual(parse_range("bytes=100", 1000), None)
+
+
+class EtagMatchesTest(unittest.TestCase):
+
+    def testStrongTag(self):
+        self.assertTrue(etag_matches('"abc"', '"abc"'))
+        self.assertFalse(etag_matches('"abd"', '"abc"'))
+
+    def testWeakComparison(self):
+        self.assertTrue(etag_matches('W/"abc"', '"abc"'))
+        self.assertTrue(etag_matches('"abc"', 'W/"abc"'))
+
+    def testList(self):
+        self.assertTrue(etag_matches('"x", W/"abc" ,"y"', '"abc"'))
+        self.assertFalse(etag_matches('"x", "y"', '"abc"'))
+
+    def testAny(self):
+        self.assertTrue(etag_matches("*", '"abc"'))
+        self.assertTrue(etag_matches(" * ", '"abc"'))
+
+
+class StaticResponseTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.root, "static"))
+        self.content = "".join(chr(i % 256) for i in range(1000))
+        with open(os.path.join(self.root, "static", "data.bin"), "wb") as _file:
+            _file.write(self.content)
+
+        class Handler(HttpHandler):
+            _static_files = StaticFiles([self.root], watch=False)
+
+        self.handler_class = Handler
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def get(self, **headers):
+        environ = {"REQUEST_METHOD": "GET", "PATH_INFO": "/static/data.bin", "wsgi.input": StringIO("")}
+        environ.update(headers)
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = status
+            response["headers"] = dict(headers)
+
+        handler = self.handler_class(environ, start_response, None, _NullLogger())
+        body = "".join(handler.handle_static("static/data.bin"))
+        return response["status"], response["headers"], body
+
+
+class StaticRangeResponseTest(StaticResponseTestCase):
+
+    def testFullResponse(self):
+        status, headers, body = self.get()
+        self.assertEqual(status, "200 OK")
+        self.assertEqual(headers["Content-Length"], "1000")
+        self.assertEqual(headers["Accept-Ranges"], "bytes")
+        self.assertEqual(body, self.content)
+
+    def testPartialResponse(self):
+        status, headers, body = self.get(HTTP_RANGE="bytes=100-199")
+        self.assertEqual(status, "206 Partial Content")
+        self.assertEqual(headers["Content-Range"], "bytes 100-199/1000")
+        self.assertEqual(headers["Content-Length"], "100")
+        self.assertEqual(body, self.content[100:200])
+
+    def testSuffixResponse(self):
+        status, headers, body = self.get(HTTP_RANGE="bytes=-10")
+        self.assertEqual(status, "206 Partial Content")
+        self.assertEqual(headers["Content-Range"], "bytes 990-999/1000")
+        self.assertEqual(body, self.content[-10:])
+
+    def testUnsatisfiableResponse(self):
+        status, headers, body = self.get(HTTP_RANGE="bytes=5000-")
+        self.assertEqual(status, "416 Requested Range Not Satisfiable")
+        self.assertEqual(headers["Content-Range"], "bytes */1000")
+        self.assertEqual(body, "")
+
+    def testMultiRangeResponse(self):
+        status, headers, body = self.get(HTTP_RANGE="bytes=0-9,20-29")
+        self.assertEqual(status, "200 OK")
+        self.assertEqual(body, self.content)
+
+    def testIfRangeMismatch(self):
+        status, headers, body = self.get(HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"other"')
+        self.assertEqual(status, "200 OK")
+        self.assertEqual(body, self.content)
+
+
+class StaticConditionalResponseTest(StaticResponseTestCase):
+
+    def etag(self):
+        return self.get()[1]["ETag"]
+
+    def testIfNoneMatch(self):
+        etag = self.etag()
+        status, headers, body = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(status, "304 Not Modified")
+        self.assertEqual(headers["ETag"], etag)
+        self.assertNotIn("Content-Length", headers)
+        self.assertEqual(body, "")
+
+    def testIfNoneMatchAny(self):
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH="*")[0], "304 Not Modified")
+
+    def testIfNoneMatchWeak(self):
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH="W/" + self.etag())[0], "304 Not Modified")
+
+    def testIfNoneMatchList(self):
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH='"other", ' + self.etag())[0], "304 Not Modified")
+
+    def testIfNoneMatchMismatch(self):
+        status, headers, body = self.get(HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(status, "200 OK")
+        self.assertEqual(body, self.content)
+
+    def testIfModifiedSince(self):
+        last_modified = self.get()[1]["Last-Modified"]
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=last_modified)[0], "304 Not Modified")
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE="Sun, 06 Nov 1994 08:49:37 GMT")[0], "200 OK")
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE="not a date")[0], "200 OK")
+
+    def testIfNoneMatchWinsOverIfModifiedSince(self):
+        last_modified = self.get()[1]["Last-Modified"]
+        status, headers, body = self.get(HTTP_IF_NONE_MATCH='"other"', HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(status, "200 OK")
+        self.assertEqual(body, self.content)
+        status, headers, body = self.get(HTTP_IF_NONE_MATCH=self.etag(),
+                                         HTTP_IF_MODIFIED_SINCE="Sun, 06 Nov 1994 08:49:37 GMT")
+        self.assertEqual(status, "304 Not Modified")
+
+
+class StaticEncodingResponseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.static = os.path.join(self.root, "static")
+        os.mkdir(self.static)
+        self.files = {"app.js": "var app = 1;", "app.js.gz": "gzip data", "app.js.br": "brotli data",
+                      "plain.js": "var plain = 1;"}
+        for name, content in self.files.items():
+            with open(os.path.join(self.static, name), "wb") as _file:
+                _file.write(content)
+            # A variant is only used if it is not older than the file.
+            os.utime(os.path.join(self.static, name), (1400000000, 1400000000))
+
+        class Handler(HttpHandler):
+            _static_files = StaticFiles([self.root], watch=False)
+
+        self.handler_class = Handler
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def get(self, name="app.js", **headers):
+        environ = {"REQUEST_METHOD": "GET", "PATH_INFO": "/static/" + name, "wsgi.input": StringIO("")}
+        environ.update(headers)
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response["status"] = status
+            response["headers"] = dict(headers)
+
+        handler = self.handler_class(environ, start_response, None, _NullLogger())
+        body = "".join(handler.handle_static("static/" + name))
+        return response["status"], response["headers"], body
+
+    def testNegotiation(self):
+        for accept_encoding, encoding in (("gzip", "gzip"), ("br", "br"), ("gzip, br", "br"),
+                                          ("br;q=0.5, gzip", "gzip"), ("*", "br"), ("br;q=0, gzip;q=0", None),
+                                          ("identity", None), ("deflate", None)):
+            status, headers, body = self.get(HTTP_ACCEPT_ENCODING=accept_encoding)
+            self.assertEqual(status, "200 OK")
+            self.assertEqual(headers["Vary"], "Accept-Encoding")
+            self.assertEqual(headers.get("Content-Encoding"), encoding)
+            if encoding is None:
+                self.assertEqual(body, self.files["app.js"])
+            else:
+                self.assertEqual(body, self.files["app.js" + {"gzip": ".gz", "br": ".br"}[encoding]])
+
+    def testNoAcceptEncoding(self):
+        status, headers, body = self.get()
+        self.assertEqual(headers["Vary"], "Accept-Encoding")
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertEqual(body, self.files["app.js"])
+
+    def testVariantsHaveOwnETags(self):
+        etags = set(self.get(HTTP_ACCEPT_ENCODING=accept_encoding)[1]["ETag"] for accept_encoding in
+                    ("", "gzip", "br"))
+        self.assertEqual(len(etags), 3)
+
+    def testNoVariants(self):
+        status, headers, body = self.get("plain.js", HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(status, "200 OK")
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertNotIn("Vary", headers)
+        self.assertEqual(body, self.files["plain.js"])
+
+    def testRemovedVariant(self):
+        os.remove(os.path.join(self.static, "app.js.br"))
+        status, headers, body = self.get(HTTP_ACCEPT_ENCODING="br")
+        self.assertEqual(status, "200 OK")
+        self.assertNotIn("Content-Encoding", headers)
+        self.assertEqual(body, self.files["app.js"])
+        status, headers, body = self.get(HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(headers["Content-Encoding"], "gzip")
+        self.assertEqual(body, self.files["app.js.gz"])
+
+
+class StaticFilesClassTest(unittest.TestCase):
+
+    def testSubclassHasOwnStaticFiles(self):
+        class Base(HttpHandler):
+            GLOBAL_STATIC = tempfile.gettempdir()
+
+        class Sub(Base):
+            GLOBAL_STATIC = os.path.join(tempfile.gettempdir(), "sub")
+
+        base = Base.static_files(watch=False)
+        sub = Sub.static_files(watch=False)
+        self.assertIsNot(base, sub)
+        self.assertIs(Base.static_files(), base)
+        self.assertIs(Sub.static_files(), sub)
+
+
+class _NullLogger(object):
+    def debug(self, *args, **kwargs):
+        pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from urlparse import parse_qs
+from dirg_util.query import parse_query, QueryLimitExceeded
+
+
+class ParseQueryTest(unittest.TestCase):
+
+    def testSingleAndRepeatedValues(self):
+        self.assertEqual(parse_query("a=1&b=2&b=3"), {"a": "1", "b": ["2", "3"]})
+        self.assertEqual(parse_query("a=1&b=2&b=3", multi=True), {"a": ["1"], "b": ["2", "3"]})
+
+    def testLikeParseQs(self):
+        query = "a=1&b=%C3%A5+%26&c=&d&a=x%3Dy;e=5"
+        self.assertEqual(parse_query(query, multi=True), parse_qs(query))
+        self.assertEqual(parse_query(query, multi=True, keep_blank_values=True),
+                         parse_qs(query, keep_blank_values=True))
+
+    def testStrictParsing(self):
+        self.assertRaises(ValueError, parse_query, "a=1&b", strict_parsing=True)
+
+    def testMaxFields(self):
+        self.assertEqual(len(parse_query("&".join("f%d=1" % i for i in range(10)), max_fields=10)), 10)
+        self.assertRaises(QueryLimitExceeded, parse_query, "&".join("f%d=1" % i for i in range(11)),
+                          max_fields=10)
+        self.assertEqual(len(parse_query("&".join("f%d=1" % i for i in range(2000)), max_fields=None)), 2000)
+
+    def testTrailingSeparatorIsNotCounted(self):
+        query = "&".join("f%d=1" % i for i in range(10))
+        self.assertEqual(len(parse_query(query + "&", max_fields=10)), 10)
+        self.assertEqual(len(parse_query("&" + query + "&&", max_fields=10)), 10)
+        self.assertEqual(len(parse_query(query.replace("&", "&&"), max_fields=10)), 10)
+
+    def testMaxLength(self):
+        self.assertEqual(parse_query("a=" + "x" * 100, max_length=100), {"a": "x" * 100})
+        self.assertRaises(QueryLimitExceeded, parse_query, "a=" + "x" * 101, max_length=100)
+        self.assertRaises(QueryLimitExceeded, parse_query, "x" * 101 + "=1", max_length=100)
+        self.assertEqual(parse_query("a=" + "x" * 101, max_length=None), {"a": "x" * 101})
+
+    def testEmpty(self):
+        self.assertEqual(parse_query(""), {})
+        self.assertEqual(parse_query("&&"), {})
+
+
+if __name__ == '__main__':
+    unittest.main()